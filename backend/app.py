@@ -1,55 +1,144 @@
-from flask import Flask, jsonify, request, send_from_directory, render_template
+from flask import Flask, jsonify, request, send_file, send_from_directory, render_template
 from flask_cors import CORS
 from config import Config
+from cache import ResponseCache
+from shared import SharedCounter
+from counters import CounterBuffer
+from feeds import FeedStore
+from snapshots import SnapshotStore, SNAPSHOT_PROJECTION
+from bulk import import_posts, export_posts
+from images import ImageStore, ImageTooLarge, UnsupportedImage
+from derivatives import DerivativeStore
+from indexes import ensure_indexes, audit_query_plans
+from auth_pool import AuthBusy, hash_password, verify_password
+from ratelimit import limited, server_busy
+from text import slugify
+from derived import DERIVED_VERSION, created_at, derive_content_fields, derive_post_fields, backfill_derived_fields
+from streaming import make_post_encoder, stream_json_array, stream_ndjson
+from logs import configure_logging
+import metrics
+import compression
+from search import InvertedIndex, MongoTextSearch, RESULT_PROJECTION, highlight, tokenize
 from flask_jwt_extended import (
     JWTManager,
     create_access_token,
     jwt_required,
+    get_jwt,
     get_jwt_identity
 )
 from datetime import datetime
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from werkzeug.middleware.proxy_fix import ProxyFix
 import base64
+import click
+import hashlib
+import io
 import os
-import uuid
-from werkzeug.security import generate_password_hash, check_password_hash
+import re
 
 
+logger = configure_logging(Config.LOG_LEVEL)
+
 # Create uploads directory if it doesn't exist
-UPLOADS_DIR = os.path.join(os.path.dirname(__file__), 'uploads', 'images')
+UPLOADS_DIR = os.getenv('UPLOADS_DIR') or os.path.join(os.path.dirname(__file__), 'uploads', 'images')
 os.makedirs(UPLOADS_DIR, exist_ok=True)
+image_store = ImageStore(UPLOADS_DIR, '/uploads/images', Config.MAX_IMAGE_BYTES)
+
+# Resized/re-encoded copies of uploads (thumb, card, hero)
+DERIVATIVES_DIR = os.path.join(os.path.dirname(__file__), 'cache', 'images')
+derivative_store = DerivativeStore(UPLOADS_DIR, DERIVATIVES_DIR, Config.IMAGE_WORKERS)
+
+# Uploads and derivatives never change once written
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Rendered RSS feeds, rebuilt only after published posts change
+FEEDS_DIR = os.path.join(os.path.dirname(__file__), 'cache', 'feeds')
+feed_store = FeedStore(FEEDS_DIR)
+
+SNAPSHOTS_DIR = os.getenv('SNAPSHOTS_DIR') or os.path.join(os.path.dirname(__file__), 'cache', 'snapshots')
+snapshot_store = SnapshotStore(
+    SNAPSHOTS_DIR, Config.SITE_URL, Config.FEED_TITLE, Config.SNAPSHOT_INDEX_INTERVAL
+)
 
 def serialize_post(post):
-    """Convert MongoDB document to JSON-serializable format"""
+    """
+    Convert MongoDB document to JSON-serializable format.
+    createdAt/updatedAt/coverImage are guaranteed at write time (see derived.py)
+    """
     if post is None:
         return None
-    
-    # Store original ObjectId before converting
-    original_id = post["_id"]
+
     post["_id"] = str(post["_id"])
-    
-    # Convert datetime objects to ISO strings
-    if "createdAt" in post:
-        if post["createdAt"]:
-            post["createdAt"] = post["createdAt"].isoformat()
-        else:
-            # If createdAt is None, try to use _id's timestamp
-            post["createdAt"] = original_id.generation_time.isoformat()
-    else:
-        # If no createdAt, use _id's generation time
-        post["createdAt"] = original_id.generation_time.isoformat()
-    
-    if "updatedAt" in post and post["updatedAt"]:
-        post["updatedAt"] = post["updatedAt"].isoformat()
-    elif "updatedAt" not in post:
-        post["updatedAt"] = post["createdAt"]
-    
-    # Provide placeholder for missing coverImage
-    if "coverImage" not in post:
-        post["coverImage"] = "/placeholder.jpg"
-    
+    for field in ("createdAt", "updatedAt"):
+        if post.get(field):
+            post[field] = post[field].isoformat()
     return post
 
+# ── Post listing helpers ───────────────────────────────────────────────
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+STREAM_BATCH_SIZE = 500
+
+# Fields returned by the summary view of /api/posts (everything but the body)
+POST_SUMMARY_PROJECTION = {
+    "title": 1,
+    "category": 1,
+    "status": 1,
+    "featured": 1,
+    "coverImage": 1,
+    "author": 1,
+    "excerpt": 1,
+    "slug": 1,
+    "readingTime": 1,
+    "views": 1,
+    "likes": 1,
+    "createdAt": 1,
+    "updatedAt": 1,
+}
+
+def encode_cursor(post_id):
+    """Turn the last _id of a page into an opaque cursor string"""
+    return base64.urlsafe_b64encode(ObjectId(post_id).binary).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return ObjectId(raw)
+    except (InvalidId, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def encode_offset_cursor(offset):
+    """Opaque cursor for result lists that can't be keyset-paginated (search)"""
+    return base64.urlsafe_b64encode(f"o{offset}".encode()).decode().rstrip("=")
+
+def decode_offset_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        if not raw.startswith("o"):
+            raise ValueError
+        return max(0, int(raw[1:]))
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def parse_limit(value):
+    """Clamp the ?limit= query parameter to [1, MAX_PAGE_SIZE]"""
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def store_image(stream):
+    """Save an uploaded image and queue its derivatives; returns the URL path"""
+    path = image_store.save_stream(stream)
+    derivative_store.schedule(os.path.basename(path))
+    return path
+
 def save_base64_image(base64_string):
     """Save base64 image to disk and return the relative path"""
     if not base64_string:
@@ -60,22 +149,13 @@ def save_base64_image(base64_string):
         if ',' in base64_string:
             base64_string = base64_string.split(',')[1]
         
-        # Decode base64
+        # Decode base64 and store it like any other upload (sniffed type,
+        # content-hash filename)
         image_data = base64.b64decode(base64_string)
-        
-        # Generate unique filename
-        filename = f"{uuid.uuid4()}.png"
-        filepath = os.path.join(UPLOADS_DIR, filename)
-        
-        # Save to disk
-        with open(filepath, 'wb') as f:
-            f.write(image_data)
-        
-        # Return the relative URL path
-        return f"/uploads/images/{filename}"
+        return store_image(io.BytesIO(image_data))
     
     except Exception as e:
-        print(f"Error saving image: {e}")
+        logger.exception("Error saving image: %s", e)
         return None
 
 app = Flask(
@@ -85,18 +165,184 @@ app = Flask(
     template_folder='../frontend/build'
 )
 
+# Take the client address from X-Forwarded-For set by our own proxies
+if Config.PROXY_COUNT:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.PROXY_COUNT)
+
+# Cache for /api/posts and /api/posts/<id>; cleared in every worker on each
+# post write through the shared generation counter
+post_cache = ResponseCache(
+    Config.POST_CACHE_SIZE,
+    Config.POST_CACHE_TTL,
+    generation=SharedCounter(os.path.join(os.path.dirname(__file__), 'cache', 'post-cache.generation')),
+)
+
+# View/like counts, written to Mongo in batches
+engagement = CounterBuffer(
+    lambda: Config.MONGO.db.posts,
+    flush_interval=Config.COUNTER_FLUSH_INTERVAL,
+    flush_threshold=Config.COUNTER_FLUSH_THRESHOLD
+)
+
+# Full-text search over posts
+if Config.SEARCH_BACKEND == "memory":
+    search_backend = InvertedIndex(
+        load_posts=lambda: Config.MONGO.db.posts.find(
+            {}, {"title": 1, "category": 1, "status": 1, "contentText": 1}
+        ),
+        fetch_posts=lambda ids: Config.MONGO.db.posts.find(
+            {"_id": {"$in": ids}}, RESULT_PROJECTION
+        ),
+        max_age=Config.SEARCH_INDEX_MAX_AGE
+    )
+else:
+    search_backend = MongoTextSearch(lambda: Config.MONGO.db.posts)
+
+def post_etag(version, body):
+    """
+    ETag of a single post: "v<version>-<body hash>". The version part is
+    what If-Match on PUT/PATCH is checked against (see update_post).
+    """
+    return f"v{version}-{hashlib.sha256(body).hexdigest()}"
+
+def cached_json_response(key, build, version_of=None):
+    """
+    Serve build()'s payload as JSON through post_cache, with a strong ETag.
+    build() returns the payload, or None when there is nothing to serve
+    (in which case None is returned and nothing is cached).
+    version_of(payload), if given, makes the ETag a post_etag.
+    """
+    entry = post_cache.get(key)
+    if entry is None:
+        payload = build()
+        if payload is None:
+            return None
+        body = jsonify(payload).get_data()
+        if version_of:
+            etag = post_etag(version_of(payload), body)
+        else:
+            etag = hashlib.sha256(body).hexdigest()
+        entry = (body, etag)
+        post_cache.set(key, entry)
+
+    body, etag = entry
+    # Compressed responses carry "<etag>-<encoding>" (see compression.py)
+    matched = next(
+        (tag for tag in (etag, f"{etag}-br", f"{etag}-gzip") if request.if_none_match.contains(tag)),
+        None
+    )
+    if matched:
+        response = app.response_class(status=304)
+        response.set_etag(matched)
+    else:
+        response = app.response_class(body, mimetype="application/json")
+        response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify(post_cache.stats()), 200
+
+def send_image(directory, filename, accel_path):
+    """
+    Send an immutable image file: long-lived cache headers, Range support
+    via send_file, and optional X-Accel-Redirect/X-Sendfile handoff.
+    """
+    path = os.path.join(directory, filename)
+    if Config.IMAGE_SENDFILE == "x-accel":
+        if not os.path.exists(path):
+            return jsonify({"error": "Image not found"}), 404
+        response = app.response_class()
+        response.headers["X-Accel-Redirect"] = f"{Config.X_ACCEL_PREFIX}/{accel_path}"
+    else:
+        response = send_from_directory(
+            directory, filename, conditional=True, max_age=IMMUTABLE_MAX_AGE
+        )
+    response.headers["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return response
+
 # Add a route to serve uploaded images
 @app.route('/uploads/images/<filename>')
 def serve_image(filename):
     try:
-        return send_from_directory(UPLOADS_DIR, filename)
+        return send_image(UPLOADS_DIR, filename, filename)
     except Exception as e:
-        print(f"Error serving image {filename}: {e}")
+        logger.exception("Error serving image %s: %s", filename, e)
+        return jsonify({"error": "Image not found"}), 404
+
+@app.route('/uploads/images/<size>/<filename>')
+def serve_image_derivative(size, filename):
+    """
+    Resized variant of an upload, e.g. /uploads/images/card/<stem>.webp.
+    Sizes: thumb, card, hero. Formats: webp, jpg, png (and avif when supported).
+    """
+    try:
+        path = derivative_store.get(size, filename)
+        if path is None:
+            return jsonify({"error": "Image not found"}), 404
+        return send_image(
+            os.path.dirname(path), filename, f"derivatives/{size}/{filename}"
+        )
+    except Exception as e:
+        logger.exception("Error serving image %s/%s: %s", size, filename, e)
         return jsonify({"error": "Image not found"}), 404
 
 @app.errorhandler(404)
 def not_found(e):
-    return render_template("index.html")
+    # The SPA shell: always revalidate, since it points at the current assets
+    response = app.make_response(render_template("index.html"))
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def update_snapshot(post):
+    """Re-render a published post's static page (a failure never fails the write)"""
+    if Config.STATIC_SNAPSHOTS:
+        try:
+            snapshot_store.update(post)
+        except Exception as e:
+            logger.exception("Error writing snapshot for post %s: %s", post["_id"], e)
+
+def remove_snapshot(post_id):
+    if Config.STATIC_SNAPSHOTS:
+        try:
+            snapshot_store.remove(post_id)
+        except Exception as e:
+            logger.exception("Error removing snapshot for post %s: %s", post_id, e)
+
+def rebuild_snapshots(store=None):
+    """Re-render every published post and the index; returns the count"""
+    store = store or snapshot_store
+    posts = Config.MONGO.db.posts.find(
+        {"status": "published"}, SNAPSHOT_PROJECTION
+    ).batch_size(STREAM_BATCH_SIZE)
+    return store.rebuild(posts)
+
+@app.route('/posts/<post_id>')
+def post_page(post_id):
+    """
+    The static snapshot of a published post when there is one (normally a
+    front proxy serves it before we get here), otherwise the SPA shell.
+    """
+    if Config.STATIC_SNAPSHOTS and ObjectId.is_valid(post_id):
+        path = snapshot_store.page_path(post_id)
+        if os.path.exists(path):
+            response = send_file(path, mimetype="text/html", conditional=True)
+            response.headers["Cache-Control"] = f"public, max-age={Config.SNAPSHOT_MAX_AGE}"
+            return response
+    return not_found(None)
+
+@app.route('/sitemap.xml')
+@app.route('/sitemap-<int:part>.xml')
+def sitemap(part=None):
+    filename = f"sitemap-{part}.xml" if part else "sitemap.xml"
+    path = os.path.join(SNAPSHOTS_DIR, filename)
+    if not Config.STATIC_SNAPSHOTS or not os.path.exists(path):
+        return jsonify({"error": "Sitemap not found"}), 404
+    response = send_file(path, mimetype="application/xml", conditional=True)
+    response.headers["Cache-Control"] = f"public, max-age={Config.SNAPSHOT_MAX_AGE}"
+    return response
 
 
 #JWT CONFIGURATION
@@ -106,29 +352,57 @@ app.config["JWT_HEADER_NAME"] = "Authorization"
 app.config["JWT_HEADER_TYPE"] = "Bearer"
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = False
 
+# Bodies past this are refused while being read, so nothing (not even
+# @limited's read_body) buffers or spools more than it
+app.config["MAX_CONTENT_LENGTH"] = Config.MAX_REQUEST_BYTES
+
+# Let Apache/lighttpd stream files for send_file() when configured
+app.config["USE_X_SENDFILE"] = Config.IMAGE_SENDFILE == "x-sendfile"
+
 jwt=JWTManager(app)
 
+# Request ids, per-route and per-Mongo-command timings, /metrics
+metrics.init_app(app)
+
+# Precompressed, cache-friendly React build; compressed API responses
+compression.init_app(app, Config.COMPRESS_MIN_SIZE)
+
 #CORS SETUP
 CORS(app,
     # resources={r"/*": {"origins": "http://localhost:3000"}},
-    supports_credentials=False
+    supports_credentials=False,
+    # Read by the editor to send back as If-Match
+    expose_headers=["ETag"]
 )
 
 
 # --- JWT error callbacks (better logging for debugging) -----------------
 @jwt.invalid_token_loader
 def custom_invalid_token_callback(error_string):
-    print(f"[JWT] Invalid token: {error_string}")
+    logger.warning("Invalid token: %s", error_string)
     return jsonify({"error": error_string}), 422
 
 
 @jwt.unauthorized_loader
 def custom_missing_token_callback(error_string):
-    print(f"[JWT] Missing token / unauthorized: {error_string}")
+    logger.warning("Missing token / unauthorized: %s", error_string)
     return jsonify({"error": error_string}), 401
 
 
-# Simple request logger for debugging Authorization header on create-post
+@app.before_request
+def limit_upload_size():
+    # Image uploads get a tighter cap than other bodies: the image plus some
+    # slack for multipart headers
+    if request.endpoint == "upload_image":
+        request.max_content_length = Config.MAX_IMAGE_BYTES + 64 * 1024
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({"error": "Request too large"}), 413
+
+
+# Debug log of the Authorization header on create-post
 @app.before_request
 def log_auth_header():
     if request.path == "/api/create-post":
@@ -137,19 +411,71 @@ def log_auth_header():
         if auth:
             # only log prefix and last 8 chars to avoid full token in logs
             masked = f"{auth[:7]}...{auth[-8:]}"
-        print(f"[DEBUG] {request.method} {request.path} Authorization: {masked}")
+        logger.debug("%s %s Authorization: %s", request.method, request.path, masked)
 
 #Routes
 @app.route('/', methods=['GET'])
 def home():
     return jsonify({"message": "You have hit the API endpoint!"})
 
+@app.route('/api/health', methods=['GET'])
+def health():
+    """Readiness check: pings MongoDB and reports this worker's pool stats"""
+    stats = Config.MONGO.stats()
+    try:
+        Config.MONGO.client.admin.command("ping")
+    except Exception as e:
+        logger.warning("Health check failed: %s", e)
+        return jsonify({"status": "unavailable", "mongo": stats}), 503
+    return jsonify({"status": "ok", "mongo": Config.MONGO.stats()}), 200
+
 @app.route('/dashboard', methods=['GET'])
 def dashboard():
     return jsonify({"message": "Welcome to the dashboard!"})
 
 #Authentication Routes
+# Author info for tokens issued before claims were added (user id -> author)
+user_cache = ResponseCache(Config.USER_CACHE_SIZE, Config.USER_CACHE_TTL)
+
+def user_claims(user):
+    """JWT claims describing a user record"""
+    return {
+        "username": user.get("username") or user.get("name", "Unknown"),
+        "email": user.get("email"),
+        "role": user.get("role", "author"),
+    }
+
+def current_author():
+    """
+    Author info ({id, name, email}) for the user making the request.
+    Read from the token claims; older tokens fall back to user_cache / the DB.
+    Returns None if the user no longer exists.
+    """
+    user_id = get_jwt_identity()
+    claims = get_jwt()
+    if claims.get("email"):
+        return {"id": user_id, "name": claims.get("username"), "email": claims["email"]}
+
+    author = user_cache.get(user_id)
+    if author is None:
+        try:
+            user_record = Config.MONGO.db.users.find_one(
+                {"_id": ObjectId(user_id)},
+                {"username": 1, "name": 1, "email": 1}
+            )
+        except Exception:
+            user_record = None
+
+        if not user_record:
+            return None
+
+        claims = user_claims(user_record)
+        author = {"id": user_id, "name": claims["username"], "email": claims["email"]}
+        user_cache.set(user_id, author)
+    return author
+
 @app.route('/api/auth/register', methods=['POST'])
+@limited("auth", per_ip=Config.AUTH_RATE_LIMIT)
 def register():
     data = request.get_json()
     username = data.get('username')
@@ -160,12 +486,15 @@ def register():
         return jsonify({"error": "Missing required fields"}), 400
 
     # Check if user already exists
-    existing_user = Config.DB.users.find_one({"email": email})
+    existing_user = Config.MONGO.db.users.find_one({"email": email})
     if existing_user:
         return jsonify({"error": "User already exists"}), 400
 
-    # Hash the password
-    hashed_password = generate_password_hash(password)
+    # Hash the password (in the auth process pool)
+    try:
+        hashed_password = hash_password(password)
+    except AuthBusy as e:
+        return server_busy(str(e))
 
     # Insert new user into database
     user_data = {
@@ -175,13 +504,14 @@ def register():
     }
     
     try:
-        Config.DB.users.insert_one(user_data)
+        Config.MONGO.db.users.insert_one(user_data)
         return jsonify({"message": "User registered successfully"}), 201
     except Exception as e:
-        print(f"Error registering user: {e}")
+        logger.exception("Error registering user: %s", e)
         return jsonify({"error": "Failed to register user"}), 500
 
 @app.route('/api/auth/login', methods=['POST'])
+@limited("auth", per_ip=Config.AUTH_RATE_LIMIT)
 def login():
     data = request.get_json()
     email = data.get('email')
@@ -191,17 +521,36 @@ def login():
         return jsonify({"error": "Missing required fields"}), 400
 
     # Find user in database
-    user = Config.DB.users.find_one({"email": email})
+    user = Config.MONGO.db.users.find_one({"email": email})
     if not user:
         return jsonify({"error": "Invalid credentials"}), 401
 
-    # Check password
-    if not check_password_hash(user["password"], password):
+    # Check password (in the auth process pool)
+    try:
+        valid, rehash = verify_password(user["password"], password)
+    except AuthBusy as e:
+        return server_busy(str(e))
+
+    if not valid:
         return jsonify({"error": "Invalid credentials"}), 401
 
-    # Use a string identity (subject) to satisfy JWT requirements
-    # We'll look up the user record from the DB inside protected endpoints.
-    access_token = create_access_token(identity=str(user["_id"]))
+    # Upgrade hashes made with an older method/work factor while we have
+    # the plaintext; failing to do so must not fail the login
+    if rehash:
+        try:
+            Config.MONGO.db.users.update_one(
+                {"_id": user["_id"], "password": user["password"]},
+                {"$set": {"password": hash_password(password)}}
+            )
+        except Exception as e:
+            logger.exception("Error rehashing password: %s", e)
+
+    # Use a string identity (subject) to satisfy JWT requirements, and carry
+    # what protected endpoints need as claims so they don't re-read the user
+    access_token = create_access_token(
+        identity=str(user["_id"]),
+        additional_claims=user_claims(user)
+    )
     return jsonify({"access_token": access_token}), 200
 
 # @app.route("/create-post", methods=["POST"])
@@ -215,7 +564,7 @@ def login():
 #     user_identity = get_jwt_identity()
 
 #     if isinstance(user_identity, str):
-#         user_record = Config.DB.users.find_one({"email": user_identity})
+#         user_record = Config.MONGO.db.users.find_one({"email": user_identity})
 #         if not user_record:
 #             return jsonify({"error": "User not found"}), 401
         
@@ -276,7 +625,7 @@ def login():
 #             }
 
 #         try:
-#             result = Config.DB.posts.insert_one(post_data)
+#             result = Config.MONGO.db.posts.insert_one(post_data)
 #             return jsonify({
 #                 "message": "Post created successfully",
 #                 "postId": str(result.inserted_id)
@@ -285,30 +634,49 @@ def login():
 #             print("Error creating post:", e)
 #             return jsonify({"error": "Failed to create post"}), 500
 
+@app.route('/api/uploads/images', methods=["POST"])
+@jwt_required()
+@limited("write", per_ip=Config.WRITE_RATE_LIMIT_IP, per_user=Config.WRITE_RATE_LIMIT_USER)
+def upload_image():
+    """
+    Upload an image without base64-encoding it.
+    Accepts multipart/form-data with an `image` field, or the raw image
+    bytes as the request body. Returns the path to reference as coverImage.
+    """
+    # Bodies over MAX_IMAGE_BYTES (plus multipart slack) are refused with a
+    # 413 as they're read (see limit_upload_size)
+    try:
+        if request.mimetype == "multipart/form-data":
+            upload = request.files.get("image")
+            if not upload:
+                return jsonify({"error": "Missing image field"}), 400
+            path = store_image(upload.stream)
+        else:
+            # @limited has already received the body into a spooled temp
+            # file (see ratelimit.read_body); stream it from there
+            path = store_image(request.stream)
+    except ImageTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    except UnsupportedImage as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.exception("Error uploading image: %s", e)
+        return jsonify({"error": "Failed to save image"}), 500
+
+    return jsonify({"path": path}), 201
+
 @app.route('/api/create-post', methods=["POST"])
 @jwt_required()
+@limited("write", per_ip=Config.WRITE_RATE_LIMIT_IP, per_user=Config.WRITE_RATE_LIMIT_USER)
 def create_post():
     """
     Create a new blog post.
-    Expects JSON payload with: title, category, status?, content, coverImage (base64 optional)
+    Expects JSON payload with: title, category, status?, content,
+    coverImage (path from /api/uploads/images, or base64; optional)
     """
-    current_user = get_jwt_identity()
-
-    # If the identity is a string (user id), fetch the user record from DB
-    if isinstance(current_user, str):
-        try:
-            user_record = Config.DB.users.find_one({"_id": ObjectId(current_user)})
-        except Exception:
-            user_record = None
-
-        if not user_record:
-            return jsonify({"error": "User not found"}), 401
-
-        current_user = {
-            "id": str(user_record["_id"]),
-            "name": user_record.get("username") or user_record.get("name", "Unknown"),
-            "email": user_record.get("email")
-        }
+    current_user = current_author()
+    if not current_user:
+        return jsonify({"error": "User not found"}), 401
 
     # ── 1. Basic payload validation ────────────────────────────────────────
     data = request.get_json(silent=True)
@@ -319,7 +687,7 @@ def create_post():
     category    = data.get("category", "").strip()
     content     = data.get("content", "").strip()
     status      = data.get("status", "draft")
-    cover_image = data.get("coverImage")  # base64 string or null
+    cover_image = data.get("coverImage")  # uploaded path, base64 string or null
 
     if not title:
         return jsonify({"error": "Title is required"}), 400
@@ -332,17 +700,21 @@ def create_post():
 
     # ── 2. Optional: Save cover image to disk ─────────────────────────
     cover_image_path = None
-    if cover_image:
+    if image_store.owns(cover_image):
+        cover_image_path = cover_image
+    elif cover_image:
         try:
             cover_image_path = save_base64_image(cover_image)
             if not cover_image_path:
                 return jsonify({"error": "Failed to save cover image"}), 400
         except Exception as e:
-            print(f"Error saving cover image: {e}")
+            logger.exception("Error saving cover image: %s", e)
             return jsonify({"error": f"Invalid cover image format: {str(e)}"}), 400
 
     # ── 3. Prepare post document ───────────────────────────────────────────
+    now = datetime.utcnow()
     post_data = {
+        "_id": ObjectId(),
         "title": title,
         "category": category,
         "status": status,
@@ -353,17 +725,25 @@ def create_post():
             "name": current_user.get("name", "Unknown"),
             "email": current_user["email"]
         },
-        "createdAt": datetime.utcnow(),
-        "updatedAt": datetime.utcnow(),
+        "createdAt": now,
+        "updatedAt": now,
+        "views": 0,
+        "likes": 0,
+        "version": 1,
         # Optional fields you might add later:
         # "tags": [],
-        # "views": 0,
-        # "likes": 0,
     }
+    # excerpt, reading time, sanitized HTML, slug: computed once, here
+    post_data.update(derive_post_fields(post_data))
 
     try:
-        result = Config.DB.posts.insert_one(post_data)
+        result = Config.MONGO.db.posts.insert_one(post_data)
         post_id = str(result.inserted_id)
+        post_cache.clear()
+        search_backend.add(post_data)
+        if status == "published":
+            feed_store.invalidate(category)
+            update_snapshot(post_data)
 
         return jsonify({
             "message": "Post created successfully",
@@ -372,104 +752,400 @@ def create_post():
         }), 201
 
     except Exception as e:
-        # In production → use proper logging (logging module or sentry)
-        print(f"Error inserting post: {str(e)}")
+        logger.exception("Error inserting post: %s", e)
         return jsonify({"error": "Failed to save post in database"}), 500
 
+def stream_posts_response(query_filter, projection, ndjson, limit=None):
+    """Encode posts one by one from the cursor, so memory stays flat"""
+    cursor = (
+        Config.MONGO.db.posts.find(query_filter, projection)
+        .sort("_id", -1)
+        .batch_size(STREAM_BATCH_SIZE)
+    )
+    if limit:
+        cursor = cursor.limit(limit)
+
+    encode = make_post_encoder(projection)
+    if ndjson:
+        return app.response_class(stream_ndjson(cursor, encode), mimetype="application/x-ndjson")
+    return app.response_class(stream_json_array(cursor, encode), mimetype="application/json")
+
 @app.route("/api/posts", methods=["GET"])
 def get_posts():
+    """
+    List posts newest first, one page at a time.
+    Query params: featured?, status?, limit? (default 20, max 100),
+    cursor? (the `next` value of the previous page), view? ("summary" | "full")
+
+    With stream=true (JSON array) or Accept: application/x-ndjson, every
+    matching post (or the first `limit`, uncapped) is streamed straight from
+    the cursor instead, for exports and large admin listings.
+    """
     try:
         # Get query parameters
         featured = request.args.get("featured", "false").lower() == "true"
         status = request.args.get("status")
-        
+        view = request.args.get("view", "summary")
+
+        try:
+            limit = parse_limit(request.args.get("limit"))
+            cursor = request.args.get("cursor")
+            after_id = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         # Build query filter
         query_filter = {}
         if featured:
             query_filter["featured"] = True
         if status:
             query_filter["status"] = status
-        
-        posts = list(Config.DB.posts.find(query_filter).sort("_id", -1))
-        posts = [serialize_post(post) for post in posts]
-        return jsonify(posts), 200
+        if after_id:
+            # Keyset pagination: _id embeds the creation time, so "older than
+            # the last one we sent" is an index range scan, not a skip()
+            query_filter["_id"] = {"$lt": after_id}
+
+        # A copy, since drivers/mocks may annotate the projection they're given
+        projection = None if view == "full" else dict(POST_SUMMARY_PROJECTION)
+
+        ndjson = request.accept_mimetypes.best_match(
+            ["application/json", "application/x-ndjson"]
+        ) == "application/x-ndjson"
+        if ndjson or request.args.get("stream", "false").lower() == "true":
+            stream_limit = max(1, int(request.args["limit"])) if "limit" in request.args else None
+            return stream_posts_response(query_filter, projection, ndjson, stream_limit)
+
+        def build_page():
+            # Fetch one extra document to know whether another page exists
+            posts = list(
+                Config.MONGO.db.posts.find(query_filter, projection)
+                .sort("_id", -1)
+                .limit(limit + 1)
+            )
+            has_more = len(posts) > limit
+            posts = posts[:limit]
+            next_cursor = encode_cursor(posts[-1]["_id"]) if has_more else None
+            return {
+                "posts": [serialize_post(post) for post in posts],
+                "next": next_cursor
+            }
+
+        cache_key = ("posts", featured, status, view, limit, cursor)
+        return cached_json_response(cache_key, build_page)
     except Exception as e:
-        print("Error fetching posts:", e)
+        logger.exception("Error fetching posts: %s", e)
         return jsonify({"error": "Failed to fetch posts"}), 500
 
-@app.route("/api/posts/<post_id>", methods=["GET", "PUT", "DELETE"])
+@app.route("/api/posts/popular", methods=["GET"])
+def popular_posts():
+    """Most viewed published posts. Query params: limit? (default 20, max 100)"""
+    try:
+        limit = parse_limit(request.args.get("limit"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def build_popular():
+        posts = (
+            Config.MONGO.db.posts.find({"status": "published"}, dict(POST_SUMMARY_PROJECTION))
+            .sort([("views", -1), ("_id", -1)])
+            .limit(limit)
+        )
+        return {"posts": [serialize_post(post) for post in posts]}
+
+    try:
+        return cached_json_response(("popular", limit), build_popular)
+    except Exception as e:
+        logger.exception("Error fetching popular posts: %s", e)
+        return jsonify({"error": "Failed to fetch popular posts"}), 500
+
+@app.route("/api/posts/<post_id>/like", methods=["POST"])
+@limited("write", per_ip=Config.WRITE_RATE_LIMIT_IP)
+def like_post(post_id):
+    try:
+        post_oid = ObjectId(post_id)
+    except (InvalidId, TypeError):
+        return jsonify({"error": "Invalid post id"}), 400
+
+    # Counted in memory and flushed in batches; unknown ids are a no-op
+    engagement.increment(post_oid, "likes")
+    return jsonify({"message": "Like recorded"}), 202
+
+@app.route("/api/search", methods=["GET"])
+def search_posts():
+    """
+    Full-text search over title, category and content, best match first.
+    Query params: q, status? (default "published"), category?, limit?, cursor?
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "Query parameter q is required"}), 400
+
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        cursor = request.args.get("cursor")
+        offset = decode_offset_cursor(cursor) if cursor else 0
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    filters = {"status": request.args.get("status", "published")}
+    category = request.args.get("category")
+    if category:
+        filters["category"] = category
+
+    try:
+        docs, has_more = search_backend.search(query, filters, offset, limit)
+        terms = tokenize(query)
+        results = [
+            {
+                "_id": str(doc["_id"]),
+                "title": doc.get("title"),
+                "category": doc.get("category"),
+                "status": doc.get("status"),
+                "coverImage": doc.get("coverImage"),
+                "createdAt": created_at(doc).isoformat(),
+                "score": round(doc.get("score", 0), 4),
+                "snippet": highlight(doc.get("contentText", ""), terms),
+            }
+            for doc in docs
+        ]
+        return jsonify({
+            "results": results,
+            "next": encode_offset_cursor(offset + limit) if has_more else None
+        }), 200
+    except Exception as e:
+        logger.exception("Error searching posts: %s", e)
+        return jsonify({"error": "Search failed"}), 500
+
+# If-Match value naming the post version an edit is based on: the post's
+# ETag as sent by GET (post_etag, possibly with a -br/-gzip suffix) or "v<version>"
+VERSION_TAG_RE = re.compile(r"^v(\d+)(?:-|$)")
+
+@limited("write", per_ip=Config.WRITE_RATE_LIMIT_IP, per_user=Config.WRITE_RATE_LIMIT_USER)
+def update_post(post_id):
+    """
+    Partial update, for PUT and PATCH alike: only the fields sent are $set
+    (title, category, status, content, coverImage).
+
+    If-Match must be the ETag the post was loaded with (which starts with
+    "v<version>"; posts written before versioning are v0) or "*".
+    Ownership, version check and write are a single conditional
+    find_one_and_update, so concurrent edits can't overwrite each other.
+    The response carries the new ETag for the next edit.
+    """
+    current_user = get_jwt_identity()
+    if not current_user:
+        return jsonify({"error": "Authorization required"}), 401
+
+    expected_version = None
+    if not request.if_match.star_tag:
+        tags = request.if_match.as_set()
+        match = VERSION_TAG_RE.match(tags.pop()) if len(tags) == 1 else None
+        if not match:
+            return jsonify({"error": "If-Match with the post's ETag is required"}), 428
+        expected_version = int(match.group(1))
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be valid JSON"}), 400
+
+    updates = {}
+    for field in ("title", "category", "content"):
+        if field in data:
+            value = str(data[field] or "").strip()
+            if not value:
+                return jsonify({"error": f"{field.capitalize()} cannot be empty"}), 400
+            updates[field] = value
+    if "status" in data:
+        updates["status"] = data["status"]
+
+    # Normally only sent when the cover changed. Uploads are content-
+    # addressed, so re-sending the same image maps to the same path anyway.
+    kept_cover = None
+    if "coverImage" in data:
+        cover_image = data["coverImage"]
+        if not cover_image:
+            updates["coverImage"] = None
+        elif not isinstance(cover_image, str):
+            return jsonify({"error": "Invalid cover image format"}), 400
+        elif image_store.owns(cover_image):
+            updates["coverImage"] = cover_image
+        elif cover_image.startswith(image_store.url_prefix + "/"):
+            # A path we didn't content-address (older uploads): only valid as
+            # the cover the post already has, which is then left untouched
+            kept_cover = cover_image
+        else:
+            cover_image_path = save_base64_image(cover_image)
+            if not cover_image_path:
+                return jsonify({"error": "Invalid cover image format"}), 400
+            updates["coverImage"] = cover_image_path
+
+    if not updates and not kept_cover:
+        return jsonify({"error": "No fields to update"}), 400
+
+    if "content" in updates:
+        updates.update(derive_content_fields(updates["content"]))
+        updates["derivedVersion"] = DERIVED_VERSION
+    if "title" in updates:
+        updates["slug"] = slugify(updates["title"])
+    # At the millisecond precision BSON stores, so the response below (and
+    # its ETag) is byte-identical to what GET will serve for this version
+    now = datetime.utcnow()
+    updates["updatedAt"] = now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+    try:
+        query = {"_id": ObjectId(post_id), "author.id": current_user}
+    except InvalidId:
+        return jsonify({"error": "Post not found"}), 404
+    if expected_version is not None:
+        query["version"] = expected_version if expected_version else {"$exists": False}
+    if kept_cover:
+        query["coverImage"] = kept_cover
+
+    try:
+        old = Config.MONGO.db.posts.find_one_and_update(
+            query,
+            {"$set": updates, "$inc": {"version": 1}},
+            return_document=ReturnDocument.BEFORE
+        )
+        if not old:
+            # Only a miss needs a second look to tell the reason apart
+            existing = Config.MONGO.db.posts.find_one(
+                {"_id": query["_id"]}, {"author.id": 1, "version": 1, "coverImage": 1}
+            )
+            if not existing:
+                return jsonify({"error": "Post not found"}), 404
+            if existing.get("author", {}).get("id") != current_user:
+                return jsonify({"error": "Permission denied"}), 403
+            if kept_cover and existing.get("coverImage") != kept_cover:
+                return jsonify({"error": "Unknown cover image"}), 400
+            return jsonify({
+                "error": "Post was changed since it was loaded",
+                "version": existing.get("version", 0)
+            }), 412
+    except Exception as e:
+        logger.exception("Error updating post: %s", e)
+        return jsonify({"error": "Failed to update post"}), 500
+
+    post = {**old, **updates, "version": old.get("version", 0) + 1}
+    post_cache.clear()
+    if updates.keys() & {"title", "contentText", "status", "category"}:
+        search_backend.add(post)
+    for doc in (old, post):
+        if doc.get("status") == "published":
+            feed_store.invalidate(doc.get("category"))
+    if post.get("status") == "published":
+        update_snapshot(post)
+    elif old.get("status") == "published":
+        remove_snapshot(post["_id"])
+
+    response = jsonify(serialize_post(post))
+    response.set_etag(post_etag(post["version"], response.get_data()))
+    return response, 200
+
+@app.route("/api/posts/<post_id>", methods=["GET", "PUT", "PATCH", "DELETE"])
 @jwt_required(optional=True)
 def delete_post(post_id):
     if request.method == "GET":
         try:
-            post = Config.DB.posts.find_one({"_id": ObjectId(post_id)})
-            if not post:
+            def build_post():
+                return serialize_post(
+                    Config.MONGO.db.posts.find_one({"_id": ObjectId(post_id)})
+                )
+
+            response = cached_json_response(
+                ("post", post_id), build_post, version_of=lambda post: post.get("version", 0)
+            )
+            if response is None:
                 return jsonify({"error": "Post not found"}), 404
-
-            post = serialize_post(post)
-            return jsonify(post), 200
+            engagement.increment(ObjectId(post_id), "views")
+            return response
         except Exception as e:
-            print("Error fetching post:", e)
+            logger.exception("Error fetching post: %s", e)
             return jsonify({"error": "Failed to fetch post"}), 500
 
+    elif request.method in ("PUT", "PATCH"):
+        return update_post(post_id)
+
     elif request.method == "DELETE":
         current_user = get_jwt_identity()
         if not current_user:
             return jsonify({"error": "Authorization required"}), 401
 
         try:
-            post = Config.DB.posts.find_one({"_id": ObjectId(post_id)})
+            # Ownership check and delete in one round trip; only a miss needs
+            # a second look to tell "not found" from "not yours"
+            post = Config.MONGO.db.posts.find_one_and_delete(
+                {"_id": ObjectId(post_id), "author.id": current_user},
+                projection={"status": 1, "category": 1}
+            )
             if not post:
+                if Config.MONGO.db.posts.count_documents({"_id": ObjectId(post_id)}, limit=1):
+                    return jsonify({"error": "Permission denied"}), 403
                 return jsonify({"error": "Post not found"}), 404
 
-            if post["author"]["id"] != current_user:
-                return jsonify({"error": "Permission denied"}), 403
-
-            Config.DB.posts.delete_one({"_id": ObjectId(post_id)})
+            post_cache.clear()
+            search_backend.remove(post["_id"])
+            if post.get("status") == "published":
+                feed_store.invalidate(post.get("category"))
+                remove_snapshot(post["_id"])
             return jsonify({"message": "Post deleted successfully"}), 200
         except Exception as e:
-            print("Error deleting post:", e)
+            logger.exception("Error deleting post: %s", e)
             return jsonify({"error": "Failed to delete post"}), 500
 
 @app.route("/rss.xml")
-def rss_feed():
-    try:
-        posts = list(Config.DB.posts.find({"status": "published"}).sort("createdAt", -1).limit(20))
-        rss_items = ""
+@app.route("/rss/<category>.xml")
+def rss_feed(category=None):
+    """
+    Serve the RSS feed (optionally for a single category) from the on-disk
+    feed cache; send_file answers If-None-Match/If-Modified-Since with 304.
+    """
+    def load_items():
+        query_filter = {"status": "published"}
+        if category:
+            query_filter["category"] = category
+
+        posts = (
+            Config.MONGO.db.posts.find(
+                query_filter,
+                {"title": 1, "excerpt": 1, "createdAt": 1}
+            )
+            .sort("createdAt", -1)
+            .limit(Config.RSS_ITEM_COUNT)
+        )
         for post in posts:
-            post_id = str(post["_id"])
-            title = post["title"]
-            link = f"http://localhost:5000/posts/{post_id}"
-            description = post["content"][:200] + "..."  # Simple excerpt
-            pub_date = post["createdAt"].strftime("%a, %d %b %Y %H:%M:%S GMT")
-            rss_items += f"""
-                <item>
-                    <title>{title}</title>
-                    <link>{link}</link>
-                    <description>{description}</description>
-                    <pubDate>{pub_date}</pubDate>
-                </item>
-            """
-
-        rss_feed = f"""<?xml version="1.0" encoding="UTF-8" ?>
-            <rss version="2.0">
-                <channel>
-                    <title>Religion Uncensored</title>
-                    <link>http://localhost:5000/</link>
-                    <description>Latest posts from my blog</description>
-                    {rss_items}
-                </channel>
-            </rss>"""
-
-        return app.response_class(rss_feed, mimetype='application/rss+xml')
+            yield {
+                "title": post.get("title"),
+                "link": f"{Config.SITE_URL}/posts/{post['_id']}",
+                # Posts the backfill hasn't reached yet lack the derived
+                # fields; they still belong in the feed
+                "description": post.get("excerpt", ""),
+                "pubDate": created_at(post),
+            }
+
+    channel = {
+        "title": f"{Config.FEED_TITLE} - {category}" if category else Config.FEED_TITLE,
+        "link": f"{Config.SITE_URL}/",
+        "description": Config.FEED_DESCRIPTION,
+    }
+
+    try:
+        # Only categories with published posts get a feed file; anything
+        # else would let arbitrary URLs fill the cache directory
+        if category and not feed_store.cached(category) and not Config.MONGO.db.posts.find_one(
+            {"status": "published", "category": category}, {"_id": 1}
+        ):
+            return jsonify({"error": "Category not found"}), 404
+        path = feed_store.get(channel, load_items, category)
+        return send_file(path, mimetype='application/rss+xml', conditional=True)
     except Exception as e:
-        print("Error generating RSS feed:", e)
+        logger.exception("Error generating RSS feed: %s", e)
         return jsonify({"error": "Failed to generate RSS feed"}), 500
 
 @app.route("/api/posts/<post_id>", methods=["GET"])
 def get_single_post(post_id):
     try:
-        post = Config.DB.posts.find_one({"_id": ObjectId(post_id)})
+        post = Config.MONGO.db.posts.find_one({"_id": ObjectId(post_id)})
 
         if not post:
             return jsonify({"error": "Post not found"}), 404
@@ -494,5 +1170,97 @@ def get_single_post(post_id):
         return jsonify({"error": str(e)}), 500
 
 
+#CLI commands
+@app.cli.command("ensure-indexes")
+def ensure_indexes_command():
+    """Create the MongoDB indexes the app's queries rely on."""
+    for name in ensure_indexes(Config.MONGO.db):
+        click.echo(f"ok  {name}")
+
+@app.cli.command("audit-queries")
+def audit_queries_command():
+    """explain() every query shape; exit non-zero if any does a COLLSCAN."""
+    failed = False
+    for name, stages, ok in audit_query_plans(Config.MONGO.db):
+        click.echo(f"{'ok  ' if ok else 'FAIL'}  {name}: {' > '.join(stages)}")
+        failed = failed or not ok
+    if failed:
+        raise SystemExit(1)
+
+@app.cli.command("precompress-assets")
+def precompress_assets_command():
+    """Write .br/.gz siblings for the React build (npm run build does this too)."""
+    written = compression.precompress_directory(app.static_folder, Config.COMPRESS_MIN_SIZE)
+    click.echo(f"Wrote {len(written)} compressed files")
+
+@app.cli.command("import-posts")
+@click.argument("source", type=click.Path(exists=True))
+@click.option("--batch-size", default=500, show_default=True)
+@click.option("--workers", type=int, default=None, help="Image processes (default: CPU count).")
+@click.option("--checkpoint", type=click.Path(), help="Progress file (default: SOURCE.checkpoint).")
+@click.option("--author-email", help="Author for records that don't carry one.")
+def import_posts_command(source, batch_size, workers, checkpoint, author_email):
+    """Import posts from an NDJSON file or an export-posts archive directory.
+
+    Interrupted imports resume from the checkpoint when run again.
+    """
+    author = None
+    if author_email:
+        user = Config.MONGO.db.users.find_one({"email": author_email})
+        if not user:
+            raise click.ClickException(f"No user with email {author_email}")
+        author = {"id": str(user["_id"]), "name": user["username"], "email": user["email"]}
+
+    inserted, skipped = import_posts(
+        Config.MONGO.db.posts, source, UPLOADS_DIR, Config.MAX_IMAGE_BYTES,
+        batch_size=batch_size, workers=workers, checkpoint=checkpoint,
+        default_author=author, echo=click.echo,
+    )
+    feed_store.clear()
+    post_cache.clear()
+    click.echo(f"Imported {inserted} posts ({skipped} already present)")
+    # Bulk writes bypass update_snapshot, so refresh pages, manifest and sitemap
+    if Config.STATIC_SNAPSHOTS and inserted:
+        click.echo(f"Rebuilt {rebuild_snapshots()} static pages")
+
+@app.cli.command("export-posts")
+@click.argument("dest", type=click.Path())
+@click.option("--with-images", is_flag=True, help="Write a directory archive including cover images.")
+@click.option("--status", help="Only export posts with this status.")
+def export_posts_command(dest, with_images, status):
+    """Export posts as NDJSON (or a directory archive with --with-images)."""
+    count = export_posts(
+        Config.MONGO.db.posts, dest,
+        uploads_dir=UPLOADS_DIR if with_images else None,
+        query_filter={"status": status} if status else None,
+    )
+    click.echo(f"Exported {count} posts to {dest}")
+
+@app.cli.command("backfill-posts")
+@click.option("--batch-size", default=500, show_default=True)
+def backfill_posts_command(batch_size):
+    """Store derived fields (excerpt, HTML, slug, ...) on older posts. Re-runnable."""
+    updated = backfill_derived_fields(Config.MONGO.db.posts, batch_size, echo=click.echo)
+    feed_store.clear()
+    post_cache.clear()
+    click.echo(f"Updated {updated} posts")
+    if Config.STATIC_SNAPSHOTS and updated:
+        click.echo(f"Rebuilt {rebuild_snapshots()} static pages")
+
+@app.cli.command("export-static")
+@click.option("--dest", type=click.Path(file_okay=False), help=f"Output directory (default: {SNAPSHOTS_DIR}).")
+def export_static_command(dest):
+    """Render every published post to static HTML plus sitemap.xml and manifest.json."""
+    store = SnapshotStore(dest, Config.SITE_URL, Config.FEED_TITLE) if dest else snapshot_store
+    count = rebuild_snapshots(store)
+    click.echo(f"Wrote {count} pages to {store.directory}")
+
+if Config.ENSURE_INDEXES:
+    try:
+        ensure_indexes(Config.MONGO.db)
+    except Exception as e:
+        logger.exception("Error creating indexes: %s", e)
+
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
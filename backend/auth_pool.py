@@ -0,0 +1,95 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+
+from config import Config
+from shared import ProcessSlots
+
+
+class AuthBusy(Exception):
+    """Raised when too many password hashes are already pending"""
+
+
+# Admission slots shared by every gunicorn worker: gunicorn.conf.py imports
+# this module in the master, so they exist before the fork, and frees the
+# slots of a worker that dies in child_exit. When all slots are taken, auth
+# requests fail fast instead of tying up the remaining workers (and their
+# reads) behind CPU-bound hashing.
+slots = ProcessSlots(Config.AUTH_MAX_PENDING)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Per-process pool of hashing processes, created on first use"""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(
+                max_workers=Config.AUTH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        _executor = None
+
+
+def _run(fn, *args):
+    slot = slots.acquire()
+    if slot is None:
+        raise AuthBusy("Authentication is busy, try again shortly")
+    try:
+        return _get_executor().submit(fn, *args).result(timeout=Config.AUTH_TIMEOUT)
+    except FutureTimeout:
+        raise AuthBusy("Authentication timed out, try again shortly")
+    except BrokenProcessPool:
+        _reset_executor()
+        raise
+    finally:
+        slots.release(slot)
+
+
+@lru_cache(maxsize=None)
+def current_hash_method():
+    """
+    The fully parameterised method string werkzeug writes for
+    PASSWORD_HASH_METHOD, filling in its defaults the way werkzeug does
+    (without hashing anything)
+    """
+    method, *args = Config.PASSWORD_HASH_METHOD.split(":")
+    if method == "scrypt":
+        n, r, p = map(int, args) if args else (2**15, 8, 1)
+        return f"scrypt:{n}:{r}:{p}"
+    if method == "pbkdf2":
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    raise ValueError(f"Invalid hash method '{method}'.")
+
+
+def needs_rehash(pwhash):
+    """True if pwhash was made with a different method or work factor"""
+    return pwhash.split("$", 1)[0] != current_hash_method()
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password, Config.PASSWORD_HASH_METHOD)
+
+
+def verify_password(pwhash, password):
+    """Returns (matches, needs_rehash)"""
+    ok = _run(check_password_hash, pwhash, password)
+    return ok, ok and needs_rehash(pwhash)
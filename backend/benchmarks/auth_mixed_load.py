@@ -0,0 +1,137 @@
+"""
+Login/upload throughput vs. read latency under mixed load.
+
+Runs login threads, upload threads and read threads against a running server
+at the same time and reports how many logins and uploads succeeded (or were
+shed with 503) and the latency of GET /api/posts meanwhile. With admission
+control working, reads stay fast and error-free while the writes that don't
+fit in MAX_IN_FLIGHT / AUTH_MAX_PENDING are shed.
+
+Logins come from one IP, so start the server with the per-IP limits out of
+the way (RATE_LIMIT_ENABLED=false, or large AUTH_RATE_LIMIT and
+WRITE_RATE_LIMIT_*); 429s are reported separately in case they aren't.
+
+    python benchmarks/auth_mixed_load.py --email you@example.com --password secret \\
+        --login-threads 8 --upload-threads 8 --read-threads 4
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.seed import make_image  # noqa: E402
+
+
+def request(url, body=None, headers=None):
+    if isinstance(body, bytes):
+        data = body
+    else:
+        data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(
+        url, data=data, headers={"Content-Type": "application/json", **(headers or {})}
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            payload = resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        payload = b""
+        status = e.code
+    return status, time.perf_counter() - start, payload
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def summarize(results, duration):
+    return {
+        "ok_per_sec": round(sum(1 for s, _ in results if 200 <= s < 300) / duration, 1),
+        "shed_503": sum(1 for s, _ in results if s == 503),
+        "rate_limited_429": sum(1 for s, _ in results if s == 429),
+        "other_errors": sum(1 for s, _ in results if not 200 <= s < 300 and s not in (429, 503)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--login-threads", type=int, default=8)
+    parser.add_argument("--upload-threads", type=int, default=0)
+    parser.add_argument("--read-threads", type=int, default=4)
+    args = parser.parse_args()
+
+    status, _, payload = request(
+        f"{args.base_url}/api/auth/login", {"email": args.email, "password": args.password}
+    )
+    if status != 200:
+        sys.exit(f"Login failed with {status}")
+    auth = {"Authorization": f"Bearer {json.loads(payload)['access_token']}"}
+    image = make_image(random.Random(1), 1600, 1200)
+
+    deadline = time.monotonic() + args.duration
+    results = {"login": [], "upload": [], "read": []}
+    lock = threading.Lock()
+
+    def worker(kind):
+        while time.monotonic() < deadline:
+            if kind == "login":
+                status, elapsed, _ = request(
+                    f"{args.base_url}/api/auth/login",
+                    {"email": args.email, "password": args.password},
+                )
+            elif kind == "upload":
+                status, elapsed, _ = request(
+                    f"{args.base_url}/api/uploads/images",
+                    image + os.urandom(16),
+                    {**auth, "Content-Type": "image/jpeg"},
+                )
+            else:
+                status, elapsed, _ = request(f"{args.base_url}/api/posts?status=published")
+            with lock:
+                results[kind].append((status, elapsed))
+
+    threads = [threading.Thread(target=worker, args=("login",)) for _ in range(args.login_threads)]
+    threads += [threading.Thread(target=worker, args=("upload",)) for _ in range(args.upload_threads)]
+    threads += [threading.Thread(target=worker, args=("read",)) for _ in range(args.read_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    reads = [elapsed for status, elapsed in results["read"] if status == 200]
+    ms = lambda v: round(v * 1000, 1) if v is not None else None
+    print(json.dumps({
+        "duration": args.duration,
+        "login": summarize(results["login"], args.duration),
+        "upload": summarize(results["upload"], args.duration),
+        "read": {
+            "ok": len(reads),
+            "errors": sum(1 for status, _ in results["read"] if status != 200),
+        },
+        "read_latency_ms": {
+            "p50": ms(percentile(reads, 50)),
+            "p95": ms(percentile(reads, 95)),
+            "p99": ms(percentile(reads, 99)),
+            "mean": ms(statistics.mean(reads)) if reads else None,
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
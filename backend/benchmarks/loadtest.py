@@ -0,0 +1,512 @@
+"""
+Reproducible load test for the blog API.
+
+Seeds a dataset, boots the app and drives each workload (list, single post,
+RSS, login, create with uploaded image, create with base64 image, delete)
+on its own, then all of them as a weighted mix. For every phase it reports
+p50/p95/p99 latency of the 2xx responses, throughput (all and 2xx only),
+status codes and the peak/mean RSS of the serving processes, and writes the
+lot to a JSON file.
+
+Two ways to boot the app:
+  --mode gunicorn   real gunicorn workers against a local mongod (--mongo-uri)
+  --mode mongomock  the app in this process against mongomock (no mongod
+                    needed; requests go through Flask's test client)
+
+Compare a run with an earlier one (e.g. from the previous commit) with
+--compare; the exit status is 1 if any phase regressed beyond --threshold.
+
+    python benchmarks/loadtest.py --mode gunicorn --mongo-uri mongodb://localhost:27017 \\
+        --dataset 50k --output bench-$(git rev-parse --short HEAD).json
+    python benchmarks/loadtest.py --mode mongomock --dataset 1k --compare bench-old.json
+"""
+import argparse
+import base64
+import collections
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import uuid
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.seed import DATASETS, make_image, seed_dataset  # noqa: E402
+
+# Relative frequency of each workload in the mixed phase
+MIX = {
+    "list": 40,
+    "single": 30,
+    "rss": 10,
+    "login": 5,
+    "create_image": 5,
+    "create_base64": 2,
+    "delete": 8,
+}
+
+
+# ── Clients ────────────────────────────────────────────────────────────────
+class HttpClient:
+    """One keep-alive connection per thread"""
+
+    def __init__(self, base_url):
+        parsed = urllib.parse.urlparse(base_url)
+        self.host, self.port = parsed.hostname, parsed.port
+        self.conn = None
+
+    def request(self, method, path, body=None, headers=None):
+        for attempt in (1, 2):
+            try:
+                if self.conn is None:
+                    self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+                self.conn.request(method, path, body=body, headers=headers or {})
+                resp = self.conn.getresponse()
+                return resp.status, resp.read()
+            except (http.client.HTTPException, ConnectionError):
+                self.conn = None
+                if attempt == 2:
+                    raise
+
+
+class FlaskClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None, headers=None):
+        resp = self.client.open(path, method=method, data=body, headers=headers or {})
+        return resp.status_code, resp.get_data()
+
+
+# ── Workloads ──────────────────────────────────────────────────────────────
+class Context:
+    """State shared by workload threads"""
+
+    def __init__(self, summary, token):
+        self.summary = summary
+        self.token = token
+        self.post_ids = summary["sample_post_ids"]
+        self.created = collections.deque()
+        rng = random.Random(7)
+        self.image = make_image(rng, 1200, 800)
+        self.image_b64 = "data:image/jpeg;base64," + base64.b64encode(self.image).decode()
+
+    def auth(self, extra=None):
+        headers = {"Authorization": f"Bearer {self.token}"}
+        headers.update(extra or {})
+        return headers
+
+
+def json_body(payload):
+    return json.dumps(payload).encode(), {"Content-Type": "application/json"}
+
+
+def post_payload(cover_image=None):
+    return {
+        "title": f"Load test {uuid.uuid4().hex[:8]}",
+        "category": "Benchmarks",
+        "status": "published",
+        "content": "<p>" + "benchmark content " * 400 + "</p>",
+        "coverImage": cover_image,
+    }
+
+
+def create_post(client, ctx, cover_image=None):
+    body, headers = json_body(post_payload(cover_image))
+    status, data = client.request("POST", "/api/create-post", body, ctx.auth(headers))
+    if status == 201:
+        ctx.created.append(json.loads(data)["postId"])
+    return status
+
+
+def w_list(client, ctx):
+    return client.request("GET", "/api/posts?status=published")[0]
+
+
+def w_single(client, ctx):
+    return client.request("GET", f"/api/posts/{random.choice(ctx.post_ids)}")[0]
+
+
+def w_rss(client, ctx):
+    return client.request("GET", "/rss.xml")[0]
+
+
+def w_login(client, ctx):
+    user = ctx.summary["user"]
+    body, headers = json_body({"email": user["email"], "password": user["password"]})
+    return client.request("POST", "/api/auth/login", body, headers)[0]
+
+
+def w_create_image(client, ctx):
+    # Random trailing bytes defeat upload dedup so every request writes a file
+    status, data = client.request(
+        "POST", "/api/uploads/images", ctx.image + os.urandom(16),
+        ctx.auth({"Content-Type": "image/jpeg"})
+    )
+    if status != 201:
+        return status
+    return create_post(client, ctx, json.loads(data)["path"])
+
+
+def w_create_base64(client, ctx):
+    return create_post(client, ctx, ctx.image_b64)
+
+
+def w_delete(client, ctx):
+    try:
+        post_id = ctx.created.popleft()
+    except IndexError:
+        return None  # nothing to delete; not recorded
+    return client.request("DELETE", f"/api/posts/{post_id}", None, ctx.auth())[0]
+
+
+WORKLOADS = {
+    "list": w_list,
+    "single": w_single,
+    "rss": w_rss,
+    "login": w_login,
+    "create_image": w_create_image,
+    "create_base64": w_create_base64,
+    "delete": w_delete,
+}
+
+
+# ── Measurement ────────────────────────────────────────────────────────────
+def rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def child_pids(parent):
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                if int(f.read().rsplit(")", 1)[1].split()[1]) == parent:
+                    pids.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            pass
+    return pids
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, get_pids, interval=0.2):
+        super().__init__(daemon=True)
+        self.get_pids = get_pids
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.samples.append(sum(rss_bytes(pid) for pid in self.get_pids()))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        mb = [s / (1024 * 1024) for s in self.samples] or [0]
+        return {"rss_peak_mb": round(max(mb), 1), "rss_mean_mb": round(sum(mb) / len(mb), 1)}
+
+
+def latency_stats(samples, status, duration):
+    """
+    samples: latencies of the 2xx responses only, so fast 429/503 rejections
+    can't make a phase look quicker; status: Counter of every response.
+    """
+    requests = sum(status.values())
+    if not requests:
+        return {"requests": 0}
+    result = {
+        "requests": requests,
+        "throughput_rps": round(requests / duration, 1),
+        "ok_rps": round(len(samples) / duration, 1),
+        "status": dict(status),
+    }
+    samples = sorted(samples)
+    if samples:
+        pick = lambda pct: round(samples[min(len(samples) - 1, int(len(samples) * pct / 100))] * 1000, 2)
+        result.update(
+            p50_ms=pick(50),
+            p95_ms=pick(95),
+            p99_ms=pick(99),
+            mean_ms=round(sum(samples) / len(samples) * 1000, 2),
+        )
+    return result
+
+
+def run_phase(make_client, ctx, weights, duration, concurrency, get_pids):
+    names = list(weights)
+    cum = list(weights.values())
+    deadline = time.monotonic() + duration
+    latencies = collections.defaultdict(list)
+    statuses = collections.defaultdict(collections.Counter)
+    lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = make_client()
+        while time.monotonic() < deadline:
+            name = rng.choices(names, cum)[0]
+            start = time.perf_counter()
+            try:
+                status = WORKLOADS[name](client, ctx)
+            except Exception as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - start
+            if status is None:
+                continue
+            with lock:
+                if str(status).startswith("2"):
+                    latencies[name].append(elapsed)
+                statuses[name][str(status)] += 1
+
+    sampler = RssSampler(get_pids)
+    sampler.start()
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+
+    result = latency_stats(
+        [s for v in latencies.values() for s in v],
+        sum(statuses.values(), collections.Counter()),
+        elapsed,
+    )
+    result.update(sampler.stop())
+    if len(weights) > 1:
+        result["endpoints"] = {
+            name: latency_stats(latencies[name], statuses[name], elapsed) for name in names
+        }
+    return result
+
+
+# ── Booting the app ────────────────────────────────────────────────────────
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def reset_app_caches():
+    """Rendered feeds/derivatives from a previous run would skew the numbers"""
+    for name in ("feeds", "images"):
+        shutil.rmtree(os.path.join(BACKEND_DIR, "cache", name), ignore_errors=True)
+
+
+# Every simulated client shares one IP and the point is to measure capacity,
+# not admission control: no rate limits, no in-flight or pending-hash caps
+UNLIMITED = dict(
+    RATE_LIMIT_ENABLED="false",
+    MAX_IN_FLIGHT="0",
+    AUTH_MAX_PENDING="4096",
+)
+
+
+def boot_gunicorn(args, uploads_dir, workdir):
+    from pymongo import MongoClient
+
+    summary = seed_dataset(
+        MongoClient(args.mongo_uri)[args.db], args.posts or DATASETS[args.dataset], uploads_dir
+    )
+    port = free_port()
+    env = dict(
+        os.environ,
+        MONGO_URI=args.mongo_uri,
+        db_name=args.db,
+        UPLOADS_DIR=uploads_dir,
+        PROMETHEUS_MULTIPROC_DIR=os.path.join(workdir, "prometheus"),
+        ENSURE_INDEXES="true",
+        LOG_LEVEL="WARNING",
+        **UNLIMITED,
+    )
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+            "--bind", f"127.0.0.1:{port}", "--workers", str(args.workers),
+            "--access-logfile", "/dev/null", "app:app",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        if proc.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            if HttpClient(base_url).request("GET", "/api/health")[0] == 200:
+                break
+        except OSError:
+            pass
+        time.sleep(0.1)
+    else:
+        proc.terminate()
+        raise RuntimeError("gunicorn did not become healthy")
+
+    return {
+        "summary": summary,
+        "make_client": lambda: HttpClient(base_url),
+        "get_pids": lambda: [proc.pid] + child_pids(proc.pid),
+        "stop": lambda: (proc.terminate(), proc.wait(30)),
+    }
+
+
+def boot_mongomock(args, uploads_dir, workdir):
+    import mongomock
+
+    os.environ.update(
+        MONGO_URI="mongodb://mongomock",
+        db_name=args.db,
+        UPLOADS_DIR=uploads_dir,
+        LOG_LEVEL="WARNING",
+        **UNLIMITED,
+    )
+    import app as blog
+    from config import Config
+
+    Config.MONGO.use_client(mongomock.MongoClient())
+    summary = seed_dataset(Config.MONGO.db, args.posts or DATASETS[args.dataset], uploads_dir)
+    return {
+        "summary": summary,
+        "make_client": lambda: FlaskClient(blog.app),
+        "get_pids": lambda: [os.getpid()] + child_pids(os.getpid()),
+        "stop": lambda: None,
+    }
+
+
+# ── Comparison ─────────────────────────────────────────────────────────────
+def compare(current, baseline, threshold):
+    """Returns a list of human-readable regressions"""
+    regressions = []
+    for phase, result in current["phases"].items():
+        base = baseline.get("phases", {}).get(phase)
+        if not base or not base.get("requests") or not result.get("requests"):
+            continue
+        if "p95_ms" in base and result.get("p95_ms", float("inf")) > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{phase}: p95 {base['p95_ms']}ms -> {result.get('p95_ms')}ms")
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{phase}: throughput {base['throughput_rps']} -> {result['throughput_rps']} req/s"
+            )
+        # Errors answered quickly keep throughput_rps up; successes are what count
+        if result.get("ok_rps", 0) < base.get("ok_rps", 0) * (1 - threshold):
+            regressions.append(f"{phase}: 2xx throughput {base['ok_rps']} -> {result.get('ok_rps', 0)} req/s")
+        if result["rss_peak_mb"] > base["rss_peak_mb"] * (1 + threshold):
+            regressions.append(f"{phase}: peak RSS {base['rss_peak_mb']}MB -> {result['rss_peak_mb']}MB")
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("\n", 2)[2],
+    )
+    parser.add_argument("--mode", choices=["gunicorn", "mongomock"], default="gunicorn")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="blog_bench")
+    parser.add_argument("--dataset", choices=DATASETS, default="1k")
+    parser.add_argument("--posts", type=int, help="overrides --dataset")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--phase-duration", type=float, default=15)
+    parser.add_argument("--delete-pool", type=int, default=200,
+                        help="posts created before the delete phase")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS),
+                        help="comma-separated subset to run in isolation")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", help="earlier results file")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    reset_app_caches()
+    workdir = tempfile.mkdtemp(prefix="blog-bench-")
+    uploads_dir = os.path.join(workdir, "uploads")
+    boot = boot_gunicorn if args.mode == "gunicorn" else boot_mongomock
+    server = boot(args, uploads_dir, workdir)
+
+    try:
+        client = server["make_client"]()
+        user = server["summary"]["user"]
+        body, headers = json_body({"email": user["email"], "password": user["password"]})
+        status, data = client.request("POST", "/api/auth/login", body, headers)
+        if status != 200:
+            raise RuntimeError(f"Benchmark login failed with {status}")
+        ctx = Context(server["summary"], json.loads(data)["access_token"])
+
+        phases = {}
+        for name in args.workloads.split(","):
+            if name == "delete":
+                for _ in range(args.delete_pool):
+                    create_post(client, ctx)
+            print(f"phase {name} ...", file=sys.stderr)
+            phases[name] = run_phase(
+                server["make_client"], ctx, {name: 1}, args.phase_duration,
+                args.concurrency, server["get_pids"]
+            )
+        print("phase mixed ...", file=sys.stderr)
+        phases["mixed"] = run_phase(
+            server["make_client"], ctx, MIX, args.phase_duration * 2,
+            args.concurrency, server["get_pids"]
+        )
+    finally:
+        server["stop"]()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "mode": args.mode,
+            "posts": server["summary"]["posts"],
+            "workers": args.workers if args.mode == "gunicorn" else 1,
+            "concurrency": args.concurrency,
+            "phase_duration_s": args.phase_duration,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "phases": phases,
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps({k: {m: v.get(m) for m in ("throughput_rps", "ok_rps", "p50_ms", "p95_ms", "p99_ms", "rss_peak_mb")}
+                      for k, v in phases.items()}, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
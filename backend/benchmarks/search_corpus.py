@@ -0,0 +1,112 @@
+"""
+Search benchmark over a seeded synthetic corpus.
+
+Builds a corpus of --posts generated posts (default 50k), indexes it with the
+in-process InvertedIndex and times a batch of queries. With --mongo-uri the
+same corpus is inserted into <db>.bench_posts, the text index is created and
+the same queries are timed against $text search.
+
+    python benchmarks/search_corpus.py --posts 50000
+    python benchmarks/search_corpus.py --mongo-uri mongodb://localhost:27017 --db blog_bench
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search import InvertedIndex, MongoTextSearch  # noqa: E402
+
+CATEGORIES = ["Doctrine", "Prophecy", "Traditions", "Testimonies", "Healing"]
+
+
+def make_corpus(count, words_per_post, seed):
+    rng = random.Random(seed)
+    # Zipf-ish vocabulary so some terms are common and most are rare
+    vocabulary = [f"word{i}" for i in range(20000)]
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(len(vocabulary))))
+    for i in range(count):
+        body = rng.choices(vocabulary, cum_weights=cum_weights, k=words_per_post)
+        yield {
+            "_id": i,
+            "title": " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=6)),
+            "category": rng.choice(CATEGORIES),
+            "status": "published" if rng.random() < 0.9 else "draft",
+            "content": "<p>" + " ".join(body) + "</p>",
+        }
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda pct: round(samples[min(len(samples) - 1, int(len(samples) * pct / 100))] * 1000, 3)
+    return {"p50_ms": pick(50), "p95_ms": pick(95), "p99_ms": pick(99)}
+
+
+def time_queries(search, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=50000)
+    parser.add_argument("--words", type=int, default=600, help="words per post")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mongo-uri")
+    parser.add_argument("--db", default="blog_bench")
+    args = parser.parse_args()
+
+    corpus = list(make_corpus(args.posts, args.words, args.seed))
+    rng = random.Random(args.seed + 1)
+    queries = [
+        " ".join(f"word{rng.randint(0, 2000)}" for _ in range(rng.randint(1, 3)))
+        for _ in range(args.queries)
+    ]
+    report = {"posts": args.posts, "words_per_post": args.words, "queries": args.queries}
+
+    by_id = {post["_id"]: post for post in corpus}
+    index = InvertedIndex(
+        load_posts=lambda: corpus,
+        fetch_posts=lambda ids: [dict(by_id[i]) for i in ids],
+        max_age=float("inf"),
+    )
+    start = time.perf_counter()
+    index.rebuild()
+    report["memory"] = {
+        "build_s": round(time.perf_counter() - start, 2),
+        "terms": len(index._postings),
+        **time_queries(lambda q: index.search(q, {"status": "published"}, 0, 20), queries),
+    }
+
+    if args.mongo_uri:
+        from pymongo import MongoClient, TEXT
+
+        collection = MongoClient(args.mongo_uri)[args.db]["bench_posts"]
+        collection.drop()
+        start = time.perf_counter()
+        for offset in range(0, len(corpus), 1000):
+            collection.insert_many(corpus[offset:offset + 1000], ordered=False)
+        collection.create_index(
+            [("title", TEXT), ("category", TEXT), ("content", TEXT)],
+            weights={"title": 10, "category": 5, "content": 1},
+        )
+        mongo = MongoTextSearch(lambda: collection)
+        report["mongo"] = {
+            "seed_and_index_s": round(time.perf_counter() - start, 2),
+            **time_queries(lambda q: mongo.search(q, {"status": "published"}, 0, 20), queries),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Seed a MongoDB database with a benchmark dataset.
+
+Creates a benchmark user and --posts posts with realistically sized HTML
+bodies, excerpts and cover images (written to --uploads-dir the same way
+uploads are stored). Presets: 1k, 50k, 500k.
+
+    python benchmarks/seed.py --mongo-uri mongodb://localhost:27017 --db blog_bench --dataset 50k
+"""
+import argparse
+import io
+import itertools
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from images import ImageStore  # noqa: E402
+from derived import derive_post_fields  # noqa: E402
+
+DATASETS = {"1k": 1000, "50k": 50000, "500k": 500000}
+
+BENCH_USER = {"username": "bench", "email": "bench@example.com", "password": "bench-password"}
+
+CATEGORIES = [
+    "Revival for Doctrine",
+    "Prophecy for Cults",
+    "Fulfilments on Traditions and witchcraft",
+    "Testimonies for Faith based Healings",
+]
+
+
+def make_image(rng, width=1600, height=900):
+    """A noisy JPEG, so it compresses about as badly as a real photo"""
+    from PIL import Image
+
+    img = Image.effect_noise((width, height), rng.randint(20, 80)).convert("RGB")
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+
+def make_body(rng, vocabulary, words):
+    paragraphs = []
+    remaining = words
+    while remaining > 0:
+        n = min(remaining, rng.randint(40, 120))
+        paragraphs.append("<p>" + " ".join(rng.choices(vocabulary, k=n)) + "</p>")
+        remaining -= n
+    return "".join(paragraphs)
+
+
+def seed_dataset(db, posts, uploads_dir, images=20, words=1200, batch_size=1000, seed=42):
+    """
+    Replace the users/posts collections with a generated dataset.
+    Returns a summary including a sample of post ids for read workloads.
+    """
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(5000)] + ["faith", "prophecy", "revival", "doctrine"]
+
+    store = ImageStore(uploads_dir, "/uploads/images", max_bytes=50 * 1024 * 1024)
+    cover_images = [store.save_stream(io.BytesIO(make_image(rng))) for _ in range(images)]
+
+    db.users.delete_many({})
+    db.posts.delete_many({})
+    user_id = db.users.insert_one({
+        "username": BENCH_USER["username"],
+        "email": BENCH_USER["email"],
+        "password": generate_password_hash(BENCH_USER["password"]),
+    }).inserted_id
+    author = {"id": str(user_id), "name": BENCH_USER["username"], "email": BENCH_USER["email"]}
+
+    # A handful of distinct bodies reused across posts keeps seeding fast
+    # while documents stay full-size
+    bodies = [make_body(rng, vocabulary, words) for _ in range(50)]
+    start = datetime.utcnow() - timedelta(minutes=posts)
+
+    sample_ids = []
+    counter = itertools.count()
+    while True:
+        docs = []
+        for i in itertools.islice(counter, batch_size):
+            if i >= posts:
+                break
+            content = rng.choice(bodies)
+            created = start + timedelta(minutes=i)
+            doc = {
+                "title": " ".join(rng.choices(vocabulary, k=rng.randint(4, 9))).title(),
+                "category": rng.choice(CATEGORIES),
+                "status": "published" if rng.random() < 0.9 else "draft",
+                "featured": rng.random() < 0.05,
+                "content": content,
+                "coverImage": rng.choice(cover_images),
+                "author": author,
+                "createdAt": created,
+                "updatedAt": created,
+            }
+            doc.update(derive_post_fields(doc))
+            docs.append(doc)
+        if not docs:
+            break
+        result = db.posts.insert_many(docs, ordered=False)
+        sample_ids.extend(str(i) for i in result.inserted_ids[:20])
+
+    return {
+        "posts": posts,
+        "images": len(cover_images),
+        "user": BENCH_USER,
+        "sample_post_ids": sample_ids[-1000:],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="blog_bench")
+    parser.add_argument("--dataset", choices=DATASETS, default="1k")
+    parser.add_argument("--posts", type=int, help="overrides --dataset")
+    parser.add_argument("--uploads-dir", required=True)
+    args = parser.parse_args()
+
+    from pymongo import MongoClient
+
+    db = MongoClient(args.mongo_uri)[args.db]
+    summary = seed_dataset(db, args.posts or DATASETS[args.dataset], args.uploads_dir)
+    print(f"Seeded {summary['posts']} posts and {summary['images']} images into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
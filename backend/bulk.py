@@ -0,0 +1,206 @@
+import base64
+import io
+import json
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from images import ImageStore
+from shared import write_atomic
+from streaming import make_post_encoder
+from derived import derive_post_fields
+
+ARCHIVE_POSTS_FILE = "posts.ndjson"
+ARCHIVE_IMAGES_DIR = "images"
+
+DUPLICATE_KEY = 11000
+
+
+# ── Import ─────────────────────────────────────────────────────────────────
+def _store_cover(value, base_dir, uploads_dir, max_bytes):
+    """
+    Runs in a pool process: store a cover image given as a data URI/base64
+    string or as a path relative to the archive. Returns (URL path, None),
+    or (None, error message) if it can't be stored, so one bad image doesn't
+    abort the import. Values already pointing at /uploads/images are kept
+    as they are.
+    """
+    if not value:
+        return value, None
+    if not isinstance(value, str):
+        return None, "coverImage is not a string"
+    if value.startswith("/uploads/images/"):
+        return value, None
+
+    store = ImageStore(uploads_dir, "/uploads/images", max_bytes)
+    try:
+        path = os.path.join(base_dir, value) if base_dir else None
+        if path and os.path.isfile(path):
+            with open(path, "rb") as f:
+                return store.save_stream(f), None
+
+        if "," in value:
+            value = value.split(",", 1)[1]
+        return store.save_stream(io.BytesIO(base64.b64decode(value))), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _parse_datetime(value):
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    return value
+
+
+def _to_document(record, cover_image, default_author):
+    """Turn one NDJSON record into a post document"""
+    created = _parse_datetime(record.get("createdAt")) or datetime.utcnow()
+    doc = {
+        "title": record["title"],
+        "category": record.get("category", ""),
+        "status": record.get("status", "draft"),
+        "content": record.get("content", ""),
+        "coverImage": cover_image,
+        "author": record.get("author") or default_author,
+        "createdAt": created,
+        "updatedAt": _parse_datetime(record.get("updatedAt")) or created,
+        "views": record.get("views", 0),
+        "likes": record.get("likes", 0),
+    }
+    if record.get("featured"):
+        doc["featured"] = True
+    if ObjectId.is_valid(record.get("_id") or ""):
+        doc["_id"] = ObjectId(record["_id"])
+    doc.update(derive_post_fields(doc))
+    return doc
+
+
+def _read_checkpoint(path):
+    try:
+        with open(path) as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def _write_checkpoint(path, line_number):
+    write_atomic(path, lambda f: f.write(str(line_number).encode()))
+
+
+def _batches(lines, size):
+    batch = []
+    for item in lines:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_posts(collection, source, uploads_dir, max_image_bytes, batch_size=500,
+                 workers=None, checkpoint=None, default_author=None, echo=print):
+    """
+    Stream posts from an NDJSON file, or a directory holding posts.ndjson
+    and images/, into the collection with batched insert_many.
+
+    Cover images are decoded/copied by a process pool; a record whose cover
+    can't be stored (bad base64, unsupported or oversized image) is imported
+    without it and its line number echoed. After each batch the
+    number of lines done is written to `checkpoint`, so re-running the same
+    command resumes after the last committed batch; records carrying an _id
+    that already exists are skipped. Returns (inserted, skipped).
+    """
+    if os.path.isdir(source):
+        base_dir = source
+        source = os.path.join(source, ARCHIVE_POSTS_FILE)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(source))
+
+    checkpoint = checkpoint or source + ".checkpoint"
+    done = _read_checkpoint(checkpoint)
+    if done:
+        echo(f"Resuming after line {done}")
+
+    inserted = skipped = 0
+    line_number = 0
+    # spawn, as in auth_pool: don't fork a process holding a MongoClient
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    with open(source, "rb") as f, pool:
+        records = (
+            (n, json.loads(line))
+            for n, line in enumerate(f, start=1)
+            if n > done and line.strip()
+        )
+        for batch in _batches(records, batch_size):
+            covers = pool.map(
+                _store_cover,
+                [record.get("coverImage") for _, record in batch],
+                [base_dir] * len(batch),
+                [uploads_dir] * len(batch),
+                [max_image_bytes] * len(batch),
+            )
+            docs = []
+            for (n, record), (cover, error) in zip(batch, covers):
+                if error:
+                    echo(f"Line {n}: cover image dropped ({error})")
+                docs.append(_to_document(record, cover, default_author))
+
+            try:
+                result = collection.insert_many(docs, ordered=False)
+                inserted += len(result.inserted_ids)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(err.get("code") != DUPLICATE_KEY for err in errors):
+                    raise
+                inserted += e.details.get("nInserted", 0)
+                skipped += len(errors)
+
+            line_number = batch[-1][0]
+            _write_checkpoint(checkpoint, line_number)
+            echo(f"... line {line_number}: {inserted} inserted, {skipped} skipped")
+
+    # Finished: the next run of this file starts from scratch
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return inserted, skipped
+
+
+# ── Export ─────────────────────────────────────────────────────────────────
+def export_posts(collection, dest, uploads_dir=None, query_filter=None, batch_size=500):
+    """
+    Stream every post to NDJSON, one document at a time from the cursor.
+
+    With uploads_dir, dest is a directory archive: posts.ndjson plus the
+    referenced cover images under images/ (importable with import_posts).
+    Returns the number of posts written.
+    """
+    encode = make_post_encoder()
+    images_dir = None
+    if uploads_dir:
+        images_dir = os.path.join(dest, ARCHIVE_IMAGES_DIR)
+        os.makedirs(images_dir, exist_ok=True)
+        dest = os.path.join(dest, ARCHIVE_POSTS_FILE)
+
+    count = 0
+    cursor = collection.find(query_filter or {}).sort("_id", 1).batch_size(batch_size)
+    with open(dest, "wb") as out:
+        for post in cursor:
+            cover = post.get("coverImage")
+            if images_dir and cover and cover.startswith("/uploads/images/"):
+                name = os.path.basename(cover)
+                source = os.path.join(uploads_dir, name)
+                if os.path.isfile(source):
+                    target = os.path.join(images_dir, name)
+                    if not os.path.exists(target):
+                        shutil.copy2(source, target)
+                    post = dict(post, coverImage=f"{ARCHIVE_IMAGES_DIR}/{name}")
+            out.write(encode(post))
+            out.write(b"\n")
+            count += 1
+    return count
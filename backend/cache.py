@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    Small in-process LRU cache with a per-entry TTL.
+
+    Each gunicorn worker holds its own instance. With a `generation`
+    (shared.SharedCounter), clear() bumps it and every worker drops its
+    entries on its next get() once it sees the new value, so a write in one
+    worker invalidates all of them.
+    """
+
+    def __init__(self, max_entries=256, ttl=30, generation=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = generation
+        self._seen_generation = generation.value() if generation else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing/expired"""
+        with self._lock:
+            if self.generation is not None:
+                current = self.generation.value()
+                if current != self._seen_generation:
+                    # Another process wrote since we cached these
+                    self._entries.clear()
+                    self._seen_generation = current
+
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                self.evictions += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, in every worker (called whenever a post is written)"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+        if self.generation is not None:
+            self.generation.increment()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxEntries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "generation": self._seen_generation,
+            }
@@ -0,0 +1,142 @@
+import gzip
+import mimetypes
+import os
+import re
+
+import brotli
+from flask import request, send_from_directory
+
+# (Content-Encoding, file suffix), in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Build output worth precompressing
+PRECOMPRESS_EXTENSIONS = (".js", ".css", ".html", ".json", ".svg", ".map", ".txt", ".xml")
+
+# CRA puts a content hash in asset names (main.1a2b3c4d.js), so they never change
+HASHED_ASSET_RE = re.compile(r"\.[0-9a-f]{8,}\.")
+
+# Buffered responses compressed on the fly. NDJSON listings are streamed
+# and RSS feeds are sent as files (direct_passthrough), so neither is
+# compressed here.
+COMPRESSIBLE_MIMETYPES = frozenset([
+    "application/json",
+    "text/html",
+])
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def precompress_directory(root, min_size=1024):
+    """
+    Write .br and .gz siblings next to every compressible file under root
+    (skipping ones already up to date). Returns the paths written.
+    """
+    written = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, name)
+            if os.path.getsize(path) < min_size:
+                continue
+
+            mtime = os.path.getmtime(path)
+            with open(path, "rb") as f:
+                data = None
+                for encoding, suffix in ENCODINGS:
+                    target = path + suffix
+                    if os.path.exists(target) and os.path.getmtime(target) >= mtime:
+                        continue
+                    if data is None:
+                        data = f.read()
+                    with open(target, "wb") as out:
+                        if encoding == "br":
+                            out.write(brotli.compress(data, quality=11))
+                        else:
+                            # mtime=0 keeps the output byte-for-byte reproducible
+                            out.write(gzip.compress(data, compresslevel=9, mtime=0))
+                    written.append(target)
+    return written
+
+
+def accepted_encodings():
+    """Encodings from ENCODINGS the client accepts, best first"""
+    return [(enc, suffix) for enc, suffix in ENCODINGS if request.accept_encodings[enc]]
+
+
+def compress_body(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=4)
+    return gzip.compress(data, compresslevel=6)
+
+
+def init_app(app, min_size=1024):
+    """
+    Serve the React build with precompressed siblings and long-lived caching
+    for hashed assets, and compress larger dynamic responses on the fly.
+    """
+
+    def serve_static(filename):
+        folder = app.static_folder
+        headers = {}
+        response = None
+        for encoding, suffix in accepted_encodings():
+            if os.path.isfile(os.path.join(folder, filename + suffix)):
+                response = send_from_directory(
+                    folder, filename + suffix,
+                    mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream"
+                )
+                headers["Content-Encoding"] = encoding
+                break
+        if response is None:
+            response = send_from_directory(folder, filename)
+
+        if filename.endswith(PRECOMPRESS_EXTENSIONS):
+            headers["Vary"] = "Accept-Encoding"
+        if HASHED_ASSET_RE.search(os.path.basename(filename)):
+            headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            headers["Cache-Control"] = "no-cache"
+        response.headers.update(headers)
+        return response
+
+    # Replace Flask's default static view
+    app.view_functions["static"] = serve_static
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        if response.content_length is not None and response.content_length < min_size:
+            return response
+
+        encodings = accepted_encodings()
+        if not encodings:
+            return response
+
+        encoding = encodings[0][0]
+        response.set_data(compress_body(response.get_data(), encoding))
+        response.headers["Content-Encoding"] = encoding
+
+        # A compressed body is a different representation: give it its own tag
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak)
+        return response
+
+
+if __name__ == "__main__":
+    # Run by the frontend's postbuild script; no app or database config needed
+    import sys
+
+    root = sys.argv[1] if len(sys.argv) > 1 else "build"
+    written = precompress_directory(root, int(os.getenv("COMPRESS_MIN_SIZE", 1024)))
+    print(f"Wrote {len(written)} compressed files")
@@ -0,0 +1,72 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from pymongo import UpdateOne
+
+from shared import BackgroundFlusher
+
+logger = logging.getLogger("blog.counters")
+
+
+class CounterBuffer:
+    """
+    Write-behind buffer for per-post counters (views, likes).
+
+    Increments are summed in memory and written as one unordered bulk_write
+    of $inc operations, every flush_interval seconds or as soon as
+    flush_threshold increments are pending. Each worker process has its own
+    buffer and flusher thread; flush() is also called on exit so pending
+    counts aren't lost on a graceful shutdown.
+    """
+
+    def __init__(self, get_collection, flush_interval=5, flush_threshold=1000):
+        self.get_collection = get_collection
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._pending = defaultdict(lambda: defaultdict(int))
+        self._count = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = BackgroundFlusher(self.flush, flush_interval, "counter-flusher")
+        atexit.register(self.flush)
+
+    def increment(self, post_id, field, amount=1):
+        with self._lock:
+            self._pending[post_id][field] += amount
+            self._count += 1
+            full = self._count >= self.flush_threshold
+        self._flusher.ensure_started()
+        if full:
+            self._flusher.wake()
+
+    def flush(self):
+        """Write all pending increments; returns the number of posts updated"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, defaultdict(lambda: defaultdict(int))
+                self._count = 0
+            if not pending:
+                return 0
+
+            ops = [
+                UpdateOne({"_id": post_id}, {"$inc": dict(fields)})
+                for post_id, fields in pending.items()
+            ]
+            try:
+                self.get_collection().bulk_write(ops, ordered=False)
+            except Exception as e:
+                logger.exception("Error flushing counters: %s", e)
+                # Put the counts back so the next flush retries them
+                with self._lock:
+                    for post_id, fields in pending.items():
+                        for field, amount in fields.items():
+                            self._pending[post_id][field] += amount
+                            self._count += 1
+                return 0
+            return len(ops)
+
+    def pending(self):
+        with self._lock:
+            return self._count
@@ -0,0 +1,113 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, features
+
+from shared import write_atomic
+
+# Target widths for each derivative size
+SIZES = {
+    "thumb": 320,
+    "card": 640,
+    "hero": 1280,
+}
+
+# Output formats we can encode, mapped to Pillow format names
+FORMATS = {
+    "webp": "WEBP",
+    "jpg": "JPEG",
+    "png": "PNG",
+}
+if features.check("avif"):
+    FORMATS["avif"] = "AVIF"
+
+SOURCE_EXTENSIONS = ("png", "jpg", "gif", "webp", "avif")
+
+logger = logging.getLogger("blog.derivatives")
+
+
+class DerivativeStore:
+    """
+    Resized / re-encoded copies of uploaded images, cached on disk.
+
+    A derivative is generated the first time it is requested (or ahead of
+    time via schedule()) and never changes afterwards, since uploads are
+    content-addressed.
+    """
+
+    def __init__(self, source_dir, cache_dir, max_workers=2):
+        self.source_dir = source_dir
+        self.cache_dir = cache_dir
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="derivatives"
+        )
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        for size in SIZES:
+            os.makedirs(os.path.join(cache_dir, size), exist_ok=True)
+
+    def find_source(self, stem):
+        """Locate the original upload for a filename stem, or None"""
+        for ext in SOURCE_EXTENSIONS:
+            path = os.path.join(self.source_dir, f"{stem}.{ext}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def get(self, size, filename):
+        """
+        Return the path of the derivative `filename` (stem.format) at `size`,
+        generating it if needed. Returns None if size, format or source is unknown.
+        """
+        stem, _, fmt = filename.rpartition(".")
+        if size not in SIZES or fmt not in FORMATS or not stem:
+            return None
+
+        path = os.path.join(self.cache_dir, size, filename)
+        if os.path.exists(path):
+            return path
+
+        source = self.find_source(stem)
+        if source is None:
+            return None
+
+        # One generator per file; concurrent requests wait for it
+        with self._lock_for(path):
+            if not os.path.exists(path):
+                self._render(source, path, SIZES[size], FORMATS[fmt])
+        with self._locks_guard:
+            self._locks.pop(path, None)
+        return path
+
+    def schedule(self, filename, formats=("webp",)):
+        """Pre-generate every size of an uploaded image in the background"""
+        stem = filename.rpartition(".")[0]
+        for size in SIZES:
+            for fmt in formats:
+                if fmt in FORMATS:
+                    self._executor.submit(self._safe_get, size, f"{stem}.{fmt}")
+
+    def _safe_get(self, size, filename):
+        try:
+            self.get(size, filename)
+        except Exception as e:
+            logger.exception("Error generating %s/%s: %s", size, filename, e)
+
+    def _lock_for(self, path):
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def _render(self, source, path, width, pil_format):
+        with Image.open(source) as img:
+            img.seek(0)
+            if img.width > width:
+                height = round(img.height * width / img.width)
+                img = img.resize((width, height), Image.LANCZOS)
+            if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            elif img.mode == "P":
+                img = img.convert("RGBA")
+
+            write_atomic(path, lambda f: img.save(f, pil_format, quality=80))
@@ -0,0 +1,95 @@
+from pymongo import UpdateOne
+
+from text import count_words, html_to_text, make_excerpt, reading_time, sanitize_html, slugify
+
+PLACEHOLDER_COVER_IMAGE = "/placeholder.jpg"
+
+# Bump when the derivation below changes, so backfill_derived_fields
+# recomputes documents written by an older version
+DERIVED_VERSION = 2
+
+# What the derived fields are computed from, plus the edit version they
+# were read at
+SOURCE_PROJECTION = {
+    "title": 1, "content": 1, "createdAt": 1, "updatedAt": 1, "coverImage": 1, "version": 1,
+}
+
+
+def created_at(post):
+    """createdAt, or for posts written before it was stored, the _id's timestamp"""
+    return post.get("createdAt") or post["_id"].generation_time.replace(tzinfo=None)
+
+
+def derive_content_fields(content):
+    """The fields that depend on the post body alone"""
+    # Excerpt, word count and search text come from the sanitized HTML, so
+    # script/style bodies don't leak into them
+    content_html = sanitize_html(content)
+    words = count_words(content_html)
+    return {
+        "excerpt": make_excerpt(content_html),
+        "wordCount": words,
+        "readingTime": reading_time(words),
+        "contentHtml": content_html,
+        # What search indexes and quotes: tag and attribute names would
+        # otherwise match nearly every post
+        "contentText": html_to_text(content_html),
+    }
+
+
+def derive_post_fields(post):
+    """
+    Fields computed from a post's title/content, stored alongside them so
+    reads are plain projections. `post` needs _id, title and content.
+    """
+    created = created_at(post)
+    fields = {
+        "createdAt": created,
+        "updatedAt": post.get("updatedAt") or created,
+        "slug": slugify(post.get("title")),
+        "coverImage": post.get("coverImage", PLACEHOLDER_COVER_IMAGE),
+        "derivedVersion": DERIVED_VERSION,
+    }
+    fields.update(derive_content_fields(post.get("content")))
+    return fields
+
+
+def backfill_derived_fields(collection, batch_size=500, echo=print):
+    """
+    Store derived fields on every post that lacks the current version.
+
+    Walks the collection in _id order, one batch per unordered bulk_write.
+    Safe to interrupt and re-run: finished documents no longer match.
+    Returns the number of posts updated.
+    """
+    query_filter = {"derivedVersion": {"$ne": DERIVED_VERSION}}
+    updated = 0
+    last_id = None
+    while True:
+        if last_id is not None:
+            query_filter["_id"] = {"$gt": last_id}
+        batch = list(
+            collection.find(query_filter, SOURCE_PROJECTION).sort("_id", 1).limit(batch_size)
+        )
+        if not batch:
+            break
+
+        ops = [
+            # Only if the post is still at the edit version that was read
+            # (None also matches posts never edited since versioning), so a
+            # concurrent edit isn't overwritten by values derived from the
+            # old content
+            UpdateOne(
+                {
+                    "_id": post["_id"],
+                    "version": post.get("version"),
+                    "derivedVersion": {"$ne": DERIVED_VERSION},
+                },
+                {"$set": derive_post_fields(post)},
+            )
+            for post in batch
+        ]
+        updated += collection.bulk_write(ops, ordered=False).modified_count
+        last_id = batch[-1]["_id"]
+        echo(f"... {updated} posts updated")
+    return updated
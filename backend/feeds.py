@@ -0,0 +1,114 @@
+import hashlib
+import os
+from datetime import timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import XMLGenerator
+
+from shared import SharedCounter, write_atomic
+
+
+def rfc822_date(dt):
+    """Format a (naive UTC or aware) datetime for <pubDate>"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return format_datetime(dt.astimezone(timezone.utc), usegmt=True)
+
+
+def write_rss(stream, channel, items):
+    """
+    Stream an RSS 2.0 document to a binary file object.
+    channel: dict with title, link, description
+    items: iterable of dicts with title, link, description, pubDate (datetime)
+    XMLGenerator takes care of escaping every text node.
+    """
+    xml = XMLGenerator(stream, encoding="utf-8", short_empty_elements=True)
+
+    def element(name, text):
+        xml.startElement(name, {})
+        xml.characters(text or "")
+        xml.endElement(name)
+
+    xml.startDocument()
+    xml.startElement("rss", {"version": "2.0"})
+    xml.startElement("channel", {})
+    element("title", channel["title"])
+    element("link", channel["link"])
+    element("description", channel["description"])
+
+    for item in items:
+        xml.startElement("item", {})
+        element("title", item["title"])
+        element("link", item["link"])
+        element("guid", item["link"])
+        element("description", item["description"])
+        element("pubDate", rfc822_date(item["pubDate"]))
+        xml.endElement("item")
+
+    xml.endElement("channel")
+    xml.endElement("rss")
+    xml.endDocument()
+
+
+class FeedStore:
+    """
+    Rendered feeds cached as files on disk.
+
+    Files are shared by all gunicorn workers, so removing one in
+    invalidate() is seen everywhere; the next request rebuilds it.
+
+    A rebuild that was reading posts while a write invalidated the feed
+    would otherwise install a feed missing that write, to be served until
+    the next one. invalidate() and clear() bump a shared generation first,
+    and a rebuild only installs its file if the generation is unchanged.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.generation = SharedCounter(os.path.join(directory, "generation"))
+
+    def path(self, category=None):
+        if not category:
+            return os.path.join(self.directory, "all.xml")
+        digest = hashlib.sha1(category.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"category-{digest}.xml")
+
+    def cached(self, category=None):
+        return os.path.exists(self.path(category))
+
+    def get(self, channel, load_items, category=None):
+        """Return the path of the rendered feed, building it if needed"""
+        path = self.path(category)
+        # Each retry means a write landed mid-render, so this settles quickly
+        while not os.path.exists(path):
+            generation = self.generation.value()
+
+            def install(tmp_path, path):
+                with self.generation.locked():
+                    if self.generation.value() == generation:
+                        os.replace(tmp_path, path)
+
+            write_atomic(path, lambda f: write_rss(f, channel, load_items()), install)
+        return path
+
+    def invalidate(self, category=None):
+        """Drop the main feed and, if given, the category's feed"""
+        self.generation.increment()
+        paths = [self.path()]
+        if category:
+            paths.append(self.path(category))
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        """Drop every rendered feed"""
+        self.generation.increment()
+        for name in os.listdir(self.directory):
+            if name.endswith(".xml"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
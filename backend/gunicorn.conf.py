@@ -1,3 +1,52 @@
+import os
+import shutil
+
+# Workers write Prometheus samples here so /metrics can aggregate them; must
+# be set before anything imports prometheus_client
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "prometheus")
+)
+
+# Imported here so their cross-worker admission slots and the shared rate-limit
+# table are created in the master and inherited by every worker
+import auth_pool  # noqa: F401,E402
+import ratelimit  # noqa: F401,E402
+from config import Config  # noqa: E402
+
 bind = "0.0.0.0:8000"
-workers = 4
-accesslog = "-"
\ No newline at end of file
+workers = Config.WORKERS
+accesslog = "-"
+
+
+def on_starting(server):
+    # Start each run with empty metric files
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def post_fork(server, worker):
+    # Each worker must build its own MongoClient; drop anything inherited
+    # from the master (e.g. with preload_app = True)
+    from config import Config
+    Config.MONGO.reset()
+
+
+def worker_exit(server, worker):
+    # Write out view/like counts still buffered in this worker, and snapshot
+    # changes not yet in the sitemap
+    import app
+    app.engagement.flush()
+    app.snapshot_store.flush()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+    # A worker killed mid-request (timeout, kill -9, OOM) never released its
+    # admission slots
+    if ratelimit.in_flight is not None:
+        ratelimit.in_flight.reclaim(worker.pid)
+    auth_pool.slots.reclaim(worker.pid)
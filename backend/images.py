@@ -0,0 +1,98 @@
+import hashlib
+import os
+import re
+import tempfile
+
+CHUNK_SIZE = 64 * 1024
+
+# Stored files are named after the SHA-256 of their bytes
+STORED_NAME_RE = re.compile(r"^[0-9a-f]{64}\.(png|jpg|gif|webp|avif)$")
+
+
+class ImageTooLarge(Exception):
+    pass
+
+
+class UnsupportedImage(Exception):
+    pass
+
+
+def sniff_image_type(head):
+    """Identify an image from its leading bytes; returns (mimetype, ext) or None"""
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png", "png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg", "jpg"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif", "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "image/avif", "avif"
+    return None
+
+
+class ImageStore:
+    """
+    Content-addressed image storage.
+
+    Uploads are streamed chunk by chunk into a temp file next to the final
+    location while being hashed, so memory use doesn't depend on image size
+    and identical uploads end up as the same file.
+    """
+
+    def __init__(self, directory, url_prefix, max_bytes):
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip("/")
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def save_stream(self, stream):
+        """Store the image read from a binary file object and return its URL path"""
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ImageTooLarge(
+                            f"Image too large (max {self.max_bytes // (1024 * 1024)}MB)"
+                        )
+                    if len(head) < 16:
+                        head += chunk[:16 - len(head)]
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            kind = sniff_image_type(head)
+            if kind is None:
+                raise UnsupportedImage("Unsupported image format")
+
+            filename = f"{digest.hexdigest()}.{kind[1]}"
+            path = os.path.join(self.directory, filename)
+            if os.path.exists(path):
+                # Same bytes were uploaded before
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return f"{self.url_prefix}/{filename}"
+
+    def owns(self, url):
+        """True if url points at an image previously stored here"""
+        if not isinstance(url, str) or not url.startswith(self.url_prefix + "/"):
+            return False
+        filename = url[len(self.url_prefix) + 1:]
+        return bool(STORED_NAME_RE.match(filename)) and os.path.exists(
+            os.path.join(self.directory, filename)
+        )
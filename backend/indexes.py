@@ -0,0 +1,97 @@
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.errors import OperationFailure
+
+# Indexes backing every query the app issues: (collection, keys, options)
+INDEXES = [
+    ("users", [("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+    ("posts", [("status", ASCENDING), ("createdAt", DESCENDING)], {"name": "status_createdAt"}),
+    ("posts", [("status", ASCENDING), ("_id", DESCENDING)], {"name": "status_id"}),
+    ("posts", [("featured", ASCENDING), ("_id", DESCENDING)], {"name": "featured_id"}),
+    ("posts", [("author.id", ASCENDING)], {"name": "author_id"}),
+    ("posts", [("status", ASCENDING), ("views", DESCENDING), ("_id", DESCENDING)], {"name": "status_views"}),
+    (
+        "posts",
+        [("title", TEXT), ("category", TEXT), ("contentText", TEXT)],
+        {"name": "posts_text", "weights": {"title": 10, "category": 5, "contentText": 1}},
+    ),
+]
+
+# Every query shape issued by app.py, with representative values:
+# (name, collection, filter, sort, limit)
+QUERY_SHAPES = [
+    ("register/login: user by email", "users", {"email": "audit@example.com"}, None, 1),
+    ("create_post: user by id", "users", {"_id": ObjectId()}, None, 1),
+    ("get_posts: all", "posts", {}, [("_id", -1)], 21),
+    ("get_posts: page after cursor", "posts", {"_id": {"$lt": ObjectId()}}, [("_id", -1)], 21),
+    ("get_posts: by status", "posts", {"status": "published"}, [("_id", -1)], 21),
+    ("get_posts: featured", "posts", {"featured": True}, [("_id", -1)], 21),
+    ("get_posts: featured + status", "posts", {"featured": True, "status": "published"}, [("_id", -1)], 21),
+    ("single post / delete", "posts", {"_id": ObjectId()}, None, 1),
+    ("rss_feed", "posts", {"status": "published"}, [("createdAt", -1)], 20),
+    ("rss_feed: category", "posts", {"status": "published", "category": "audit"}, [("createdAt", -1)], 20),
+    ("ownership: posts by author", "posts", {"author.id": "audit"}, None, 0),
+    ("popular posts", "posts", {"status": "published"}, [("views", -1), ("_id", -1)], 20),
+    ("search", "posts", {"$text": {"$search": "audit"}, "status": "published"}, None, 21),
+]
+
+
+# IndexOptionsConflict, IndexKeySpecsConflict
+INDEX_CONFLICT_CODES = (85, 86)
+
+
+def _drop_conflicting(collection, keys, name):
+    """Drop the index that `name` redefines (a collection has one text index)"""
+    text = any(direction == TEXT for _, direction in keys)
+    for existing, info in list(collection.index_information().items()):
+        if existing == name or (text and any(k == "_fts" for k, _ in info["key"])):
+            collection.drop_index(existing)
+
+
+def ensure_indexes(db):
+    """
+    Create the indexes in INDEXES; safe to run repeatedly. An index whose
+    definition changed (e.g. posts_text moving to contentText) is dropped
+    and recreated. Returns their names.
+    """
+    created = []
+    for collection, keys, options in INDEXES:
+        try:
+            created.append(db[collection].create_index(keys, **options))
+        except OperationFailure as e:
+            if e.code not in INDEX_CONFLICT_CODES:
+                raise
+            _drop_conflicting(db[collection], keys, options["name"])
+            created.append(db[collection].create_index(keys, **options))
+    return created
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _plan_stages(value)
+
+
+def audit_query_plans(db):
+    """
+    Run explain() on every query shape and report the winning plan's stages.
+    Returns a list of (name, stages, ok) where ok is False for a COLLSCAN.
+    """
+    results = []
+    for name, collection, query_filter, sort, limit in QUERY_SHAPES:
+        cursor = db[collection].find(query_filter)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        winning_plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        stages = list(dict.fromkeys(_plan_stages(winning_plan)))
+        results.append((name, stages, "COLLSCAN" not in stages))
+    return results
@@ -0,0 +1,104 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+from flask import g, has_request_context
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request id (see metrics.py) to every record"""
+
+    def filter(self, record):
+        record.request_id = g.get("request_id") if has_request_context() else None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        # Records from QueueLogHandler carry the traceback already formatted
+        exc = record.exc_text
+        if not exc and record.exc_info:
+            exc = self.formatException(record.exc_info)
+        if exc:
+            entry["exc"] = exc
+        return json.dumps(entry, default=str)
+
+
+class QueueLogHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records for a QueueListener writing to `target`. The listener
+    thread is started per process on first use: threads don't survive fork,
+    so one started at import would only run in the gunicorn master.
+    """
+
+    def __init__(self, target):
+        super().__init__(queue.SimpleQueue())
+        self.target = target
+        self._listener = None
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+        atexit.register(self._stop_listener)
+
+    def _ensure_listener(self):
+        if self._listener_pid != os.getpid():
+            with self._listener_lock:
+                if self._listener_pid != os.getpid():
+                    # A fresh queue, so records the parent hadn't written yet
+                    # aren't written again by every child
+                    self.queue = queue.SimpleQueue()
+                    self._listener = logging.handlers.QueueListener(self.queue, self.target)
+                    self._listener.start()
+                    self._listener_pid = os.getpid()
+
+    def _stop_listener(self):
+        if self._listener_pid == os.getpid():
+            self._listener.stop()
+
+    def prepare(self, record):
+        # The base class merges the traceback into msg and drops exc_info;
+        # keep it apart in exc_text so JsonFormatter can report it as "exc"
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.target.formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
+
+
+def configure_logging(level="INFO"):
+    """
+    Route the "blog" logger through a queue: request threads only enqueue,
+    and a listener thread formats and writes to stderr.
+    """
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter())
+    queue_handler = QueueLogHandler(stream_handler)
+    # The filter must run on the request thread, where the request id lives
+    queue_handler.addFilter(RequestIdFilter())
+
+    logger = logging.getLogger("blog")
+    logger.setLevel(level)
+    logger.handlers[:] = [queue_handler]
+    logger.propagate = False
+    return logger
@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+import uuid
+
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+from pymongo import monitoring
+
+# With PROMETHEUS_MULTIPROC_DIR set (see gunicorn.conf.py), every worker
+# writes its samples to files there and /metrics aggregates all of them.
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route",
+    ["method", "route", "status"],
+)
+
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency by collection and operation",
+    ["collection", "command"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total",
+    "Failed MongoDB commands by collection and operation",
+    ["collection", "command"],
+)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every command PyMongo sends, tagged by collection and operation"""
+
+    def __init__(self):
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = ""
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = collection
+
+    def _pop_collection(self, event):
+        with self._lock:
+            return self._collections.pop((event.connection_id, event.request_id), "")
+
+    def succeeded(self, event):
+        MONGO_COMMAND_LATENCY.labels(
+            self._pop_collection(event), event.command_name
+        ).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._pop_collection(event)
+        MONGO_COMMAND_LATENCY.labels(collection, event.command_name).observe(
+            event.duration_micros / 1e6
+        )
+        MONGO_COMMAND_FAILURES.labels(collection, event.command_name).inc()
+
+
+def init_app(app):
+    """Request ids, per-route timing and the /metrics endpoint"""
+    # Must be registered before the (lazy) MongoClient is created
+    monitoring.register(MongoCommandMetrics())
+
+    @app.before_request
+    def start_timer():
+        g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get("request_started")
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            REQUEST_LATENCY.labels(
+                request.method, route, response.status_code
+            ).observe(time.perf_counter() - started)
+        response.headers["X-Request-ID"] = g.get("request_id", "")
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return app.response_class(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
@@ -0,0 +1,141 @@
+import os
+import threading
+
+from pymongo import MongoClient
+from pymongo.monitoring import ConnectionPoolListener
+
+
+class PoolStats(ConnectionPoolListener):
+    """Counts connection pool events for the health endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.open = 0
+            self.checked_out = 0
+            self.created = 0
+            self.closed = 0
+            self.checkout_failures = 0
+            self.pool_clears = 0
+
+    def _add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add(pool_clears=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._add(created=1, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(closed=1, open=-1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._add(checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._add(checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._add(checked_out=-1)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "open": self.open,
+                "checkedOut": self.checked_out,
+                "created": self.created,
+                "closed": self.closed,
+                "checkoutFailures": self.checkout_failures,
+                "poolClears": self.pool_clears,
+            }
+
+
+class MongoConnection:
+    """
+    Lazily created, per-process MongoClient.
+
+    Nothing connects at import time. The client is built on first use in
+    each process, and rebuilt if the process has forked since (PyMongo
+    clients must not be shared across fork), so gunicorn workers each get
+    their own pool.
+    """
+
+    def __init__(self, uri, db_name, **client_options):
+        self.uri = uri
+        self.db_name = db_name
+        self.client_options = client_options
+        self.pool_stats = PoolStats()
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None or self._pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._pid != os.getpid():
+                    self.pool_stats.reset()
+                    self._client = MongoClient(
+                        self.uri,
+                        connect=False,
+                        event_listeners=[self.pool_stats],
+                        **self.client_options
+                    )
+                    self._pid = os.getpid()
+        return self._client
+
+    @property
+    def db(self):
+        return self.client[self.db_name]
+
+    def use_client(self, client):
+        """Use an existing client (e.g. mongomock in benchmarks) in this process"""
+        with self._lock:
+            self._client = client
+            self._pid = os.getpid()
+
+    def reset(self):
+        """
+        Forget the current client without closing it (call after fork: the
+        sockets belong to the parent process).
+        """
+        with self._lock:
+            self._client = None
+            self._pid = None
+
+    def close(self):
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+
+    def stats(self):
+        return {
+            "pid": os.getpid(),
+            "connected": self._client is not None and self._pid == os.getpid(),
+            "maxPoolSize": self.client_options.get("maxPoolSize"),
+            "minPoolSize": self.client_options.get("minPoolSize"),
+            "pool": self.pool_stats.snapshot(),
+        }
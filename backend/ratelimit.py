@@ -0,0 +1,154 @@
+import hashlib
+import math
+import mmap
+import multiprocessing
+import shutil
+import struct
+import tempfile
+import time
+from functools import wraps
+
+from flask import jsonify, request
+from flask_jwt_extended import get_jwt_identity
+
+from config import Config
+from shared import ProcessSlots
+
+# Raw bodies larger than this are spooled to disk by read_body (the same
+# threshold werkzeug uses for uploaded form files)
+SPOOL_MAX_MEMORY = 500 * 1024
+
+# One bucket: key hash, tokens left, time of last update (monotonic seconds,
+# which is system-wide on Linux and so comparable between workers)
+SLOT = struct.Struct("=Qdd")
+
+
+def parse_rate(value):
+    """'10/60' -> (10, 60.0): 10 requests per 60 seconds. '' or '0' -> None"""
+    if not value or value == "0":
+        return None
+    count, _, seconds = value.partition("/")
+    return int(count), float(seconds or 1)
+
+
+class TokenBuckets:
+    """
+    Token buckets kept in an anonymous shared mmap, so every gunicorn worker
+    forked from the master updates the same table; nothing external needed.
+
+    The table is direct-mapped: a key lives in slot hash % slots, and another
+    key hashing to the same slot takes it over with a full bucket. That only
+    ever errs towards letting a request through. A decision is one hash and
+    a struct read/write under a lock: a few microseconds.
+    """
+
+    def __init__(self, slots=65536):
+        self.slots = slots
+        self._buf = mmap.mmap(-1, slots * SLOT.size)
+        self._lock = multiprocessing.Lock()
+
+    def take(self, key, count, period, cost=1):
+        """
+        Spend `cost` tokens from key's bucket (holding up to `count`, refilled
+        at count/period per second). Returns 0 if allowed, otherwise the
+        seconds until enough tokens will be available.
+        """
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+        offset = (digest % self.slots) * SLOT.size
+        rate = count / period
+        now = time.monotonic()
+        with self._lock:
+            stored, tokens, last = SLOT.unpack_from(self._buf, offset)
+            if stored != digest:
+                tokens = float(count)
+            else:
+                tokens = min(count, tokens + (now - last) * rate)
+            if tokens >= cost:
+                SLOT.pack_into(self._buf, offset, digest, tokens - cost, now)
+                return 0
+            SLOT.pack_into(self._buf, offset, digest, tokens, now)
+        return (cost - tokens) / rate
+
+
+# Created at import: gunicorn.conf.py imports this module in the master, so
+# the table and the in-flight slots are shared by every worker
+buckets = TokenBuckets(Config.RATE_LIMIT_SLOTS)
+in_flight = ProcessSlots(Config.MAX_IN_FLIGHT) if Config.MAX_IN_FLIGHT > 0 else None
+
+
+def too_many_requests(wait):
+    response = jsonify({"error": "Too many requests, try again later"})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(max(1, math.ceil(wait)))
+    return response
+
+
+def server_busy(message="Server is busy, try again shortly"):
+    response = jsonify({"error": message})
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
+
+def read_body():
+    """
+    Receive the whole request body now (bounded by request.max_content_length)
+    without holding large bodies in memory: forms are parsed (werkzeug spools
+    their files to disk), JSON is cached for get_json(), and any other body
+    is copied to a spooled temp file that then serves as request.stream.
+    """
+    if request.mimetype in ("multipart/form-data", "application/x-www-form-urlencoded"):
+        request.files
+    elif request.is_json:
+        request.get_data(cache=True)
+    else:
+        spool = tempfile.SpooledTemporaryFile(SPOOL_MAX_MEMORY)
+        shutil.copyfileobj(request.stream, spool)
+        spool.seek(0)
+        # Removed when the request (and with it the file object) goes away
+        request.stream = spool
+
+
+def limited(scope, per_ip=None, per_user=None):
+    """
+    Admission control for an expensive route. Apply below @jwt_required so
+    the per-user bucket can see the identity.
+
+    per_ip/per_user: rates like '10/60' (see parse_rate); over the limit the
+    request gets a 429. All limited routes also share MAX_IN_FLIGHT slots
+    across workers; when they are taken the request is shed with a 503, so
+    the remaining workers stay free for reads. The (size-capped) body is read
+    before a slot is taken, so a client that stalls mid-body only ties up
+    its own worker.
+    """
+    ip_rate = parse_rate(per_ip)
+    user_rate = parse_rate(per_user)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if Config.RATE_LIMIT_ENABLED:
+                if ip_rate:
+                    wait = buckets.take(f"{scope}:ip:{request.remote_addr}", *ip_rate)
+                    if wait:
+                        return too_many_requests(wait)
+                user = get_jwt_identity() if user_rate else None
+                if user:
+                    wait = buckets.take(f"{scope}:user:{user}", *user_rate)
+                    if wait:
+                        return too_many_requests(wait)
+
+            if in_flight is None:
+                return view(*args, **kwargs)
+            read_body()
+            slot = in_flight.acquire()
+            if slot is None:
+                return server_busy()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                in_flight.release(slot)
+
+        return wrapped
+
+    return decorator
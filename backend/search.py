@@ -0,0 +1,210 @@
+import heapq
+import html
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or that
+the this to was were will with
+""".split())
+
+# Relative weight of a match in each field (same as the Mongo text index)
+FIELD_WEIGHTS = {"title": 10, "category": 5, "contentText": 1}
+
+# Fields a search result needs (contentText is only used for the snippet)
+RESULT_PROJECTION = {
+    "title": 1,
+    "category": 1,
+    "status": 1,
+    "coverImage": 1,
+    "contentText": 1,
+    "createdAt": 1,
+}
+
+SNIPPET_RADIUS = 80
+
+
+def tokenize(text):
+    """Lowercased word tokens without stopwords"""
+    if not text:
+        return []
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def highlight(text, terms, radius=SNIPPET_RADIUS):
+    """
+    HTML-escaped snippet of plain text around the first match of any term,
+    with every match wrapped in <mark>. Terms match as word prefixes so
+    stemmed Mongo matches ("run" -> "running") are highlighted too.
+    """
+    if not terms:
+        return html.escape(text[:radius * 2])
+
+    alternatives = "|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True))
+    pattern = re.compile(r"\b(?:%s)\w*" % alternatives, re.IGNORECASE)
+
+    first = pattern.search(text)
+    start = max(0, first.start() - radius) if first else 0
+    end = min(len(text), start + radius * 2)
+    window = text[start:end]
+
+    parts = []
+    pos = 0
+    for match in pattern.finditer(window):
+        parts.append(html.escape(window[pos:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        pos = match.end()
+    parts.append(html.escape(window[pos:]))
+
+    snippet = "".join(parts)
+    if start > 0:
+        snippet = "..." + snippet
+    if end < len(text):
+        snippet += "..."
+    return snippet
+
+
+class MongoTextSearch:
+    """Search backed by the posts text index (see indexes.py)"""
+
+    def __init__(self, get_collection):
+        self.get_collection = get_collection
+
+    def search(self, query, filters, offset, limit):
+        """Returns (docs, has_more); docs carry a `score` field"""
+        projection = dict(RESULT_PROJECTION, score={"$meta": "textScore"})
+        docs = list(
+            self.get_collection()
+            .find({"$text": {"$search": query}, **filters}, projection)
+            .sort([("score", {"$meta": "textScore"}), ("_id", -1)])
+            .skip(offset)
+            .limit(limit + 1)
+        )
+        return docs[:limit], len(docs) > limit
+
+    # The text index is maintained by MongoDB itself
+    def add(self, post):
+        pass
+
+    def remove(self, post_id):
+        pass
+
+
+class InvertedIndex:
+    """
+    In-process inverted index, for deployments without Mongo text search.
+
+    Built from load_posts() on first use, then updated incrementally with
+    add()/remove(). Each gunicorn worker has its own copy and only sees its
+    own writes, so the whole index is rebuilt once it is max_age seconds old.
+    Only postings and filter fields are kept in memory; result documents are
+    fetched with fetch_posts(ids) for the requested page.
+    """
+
+    def __init__(self, load_posts, fetch_posts, max_age=300):
+        self.load_posts = load_posts
+        self.fetch_posts = fetch_posts
+        self.max_age = max_age
+        self._postings = defaultdict(dict)  # term -> {post_id: weighted tf}
+        self._docs = {}                     # post_id -> (status, category, terms)
+        self._built_at = None
+        self._lock = threading.RLock()
+
+    def rebuild(self):
+        with self._lock:
+            self._postings = defaultdict(dict)
+            self._docs = {}
+            for post in self.load_posts():
+                self._add(post)
+            self._built_at = time.monotonic()
+
+    def _ensure_built(self):
+        if self._built_at is None or time.monotonic() - self._built_at > self.max_age:
+            self.rebuild()
+
+    def _add(self, post):
+        post_id = post["_id"]
+        self._remove(post_id)
+
+        weights = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(post.get(field)):
+                weights[term] += weight
+
+        for term, weight in weights.items():
+            # Dampen long documents repeating a term
+            self._postings[term][post_id] = 1 + math.log(weight)
+        self._docs[post_id] = (post.get("status"), post.get("category"), tuple(weights))
+
+    def _remove(self, post_id):
+        doc = self._docs.pop(post_id, None)
+        if doc is None:
+            return
+        for term in doc[2]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(post_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def add(self, post):
+        with self._lock:
+            if self._built_at is not None:
+                self._add(post)
+
+    def remove(self, post_id):
+        with self._lock:
+            if self._built_at is not None:
+                self._remove(post_id)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def rank(self, query, filters, offset, limit):
+        """Returns ([(post_id, score)], has_more) for one page"""
+        with self._lock:
+            self._ensure_built()
+            total = len(self._docs) or 1
+            scores = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + total / len(postings))
+                for post_id, tf in postings.items():
+                    scores[post_id] += tf * idf
+
+            status = filters.get("status")
+            category = filters.get("category")
+            if status or category:
+                scores = {
+                    post_id: score for post_id, score in scores.items()
+                    if (not status or self._docs[post_id][0] == status)
+                    and (not category or self._docs[post_id][1] == category)
+                }
+
+        ranked = heapq.nlargest(
+            offset + limit + 1, scores.items(), key=lambda item: (item[1], item[0])
+        )
+        page = ranked[offset:offset + limit]
+        return page, len(ranked) > offset + limit
+
+    def search(self, query, filters, offset, limit):
+        """Returns (docs, has_more); docs carry a `score` field"""
+        page, has_more = self.rank(query, filters, offset, limit)
+        if not page:
+            return [], has_more
+
+        docs = {doc["_id"]: doc for doc in self.fetch_posts([post_id for post_id, _ in page])}
+        results = []
+        for post_id, score in page:
+            doc = docs.get(post_id)
+            if doc is not None:
+                doc["score"] = score
+                results.append(doc)
+        return results, has_more
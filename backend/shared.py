@@ -0,0 +1,163 @@
+import fcntl
+import mmap
+import multiprocessing
+import os
+import struct
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# One slot: pid of the process holding it, 0 when free
+SLOT = struct.Struct("=q")
+COUNTER = struct.Struct("=Q")
+
+
+def write_atomic(path, write, replace=os.replace):
+    """
+    Write a file through a temp file next to it and a rename, so readers
+    never see half of it. write(f) fills the binary file object;
+    replace(tmp_path, path) installs it and may decline to, e.g. when what
+    was written is already stale. The temp file never outlives the call.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class BackgroundFlusher:
+    """
+    A daemon thread calling flush() every `interval` seconds, or as soon as
+    wake() is called. Threads don't survive fork, so ensure_started()
+    starts one per process on first use.
+    """
+
+    def __init__(self, flush, interval, name):
+        self.flush = flush
+        self.interval = interval
+        self.name = name
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread_pid = None
+
+    def ensure_started(self):
+        if self._thread_pid != os.getpid():
+            with self._lock:
+                if self._thread_pid != os.getpid():
+                    self._thread_pid = os.getpid()
+                    threading.Thread(target=self._run, name=self.name, daemon=True).start()
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ProcessSlots:
+    """
+    A counting semaphore in an anonymous shared mmap, for admission limits
+    shared by every gunicorn worker (create it in the master, before fork).
+
+    Unlike multiprocessing.Semaphore each slot records the pid holding it,
+    so a worker that dies mid-request (kill -9, timeout abort, OOM kill)
+    can't leak it: gunicorn's child_exit calls reclaim(pid), and acquire()
+    also takes over slots whose holder no longer exists.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._buf = mmap.mmap(-1, max(size, 1) * SLOT.size)
+        self._lock = multiprocessing.Lock()
+
+    def _holder(self, index):
+        return SLOT.unpack_from(self._buf, index * SLOT.size)[0]
+
+    def acquire(self):
+        """Take a slot without blocking; returns its index, or None if all are taken"""
+        pid = os.getpid()
+        with self._lock:
+            for index in range(self.size):
+                if self._holder(index) == 0:
+                    SLOT.pack_into(self._buf, index * SLOT.size, pid)
+                    return index
+            # All taken: only now pay for a liveness check per holder
+            for index in range(self.size):
+                holder = self._holder(index)
+                if holder != pid and not pid_alive(holder):
+                    SLOT.pack_into(self._buf, index * SLOT.size, pid)
+                    return index
+        return None
+
+    def release(self, index):
+        with self._lock:
+            if self._holder(index) == os.getpid():
+                SLOT.pack_into(self._buf, index * SLOT.size, 0)
+
+    def reclaim(self, pid):
+        """Free every slot held by pid (a worker that exited); returns how many"""
+        freed = 0
+        with self._lock:
+            for index in range(self.size):
+                if self._holder(index) == pid:
+                    SLOT.pack_into(self._buf, index * SLOT.size, 0)
+                    freed += 1
+        return freed
+
+    def in_use(self):
+        with self._lock:
+            return sum(1 for index in range(self.size) if self._holder(index))
+
+
+class SharedCounter:
+    """
+    A 64-bit counter in a small file that every process maps, so gunicorn
+    workers (and CLI commands) see each other's increments without having
+    to create anything before fork. Reading it is a memory access;
+    increments are serialised with a lockf record lock.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size < COUNTER.size:
+            os.ftruncate(self._fd, COUNTER.size)
+        self._buf = mmap.mmap(self._fd, COUNTER.size)
+        # lockf locks belong to the process, so threads need their own lock
+        self._lock = threading.Lock()
+
+    def value(self):
+        return COUNTER.unpack_from(self._buf)[0]
+
+    @contextmanager
+    def locked(self):
+        """Hold off increments, e.g. to act only if the value is unchanged"""
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def increment(self):
+        with self.locked():
+            value = self.value() + 1
+            COUNTER.pack_into(self._buf, 0, value)
+        return value
@@ -0,0 +1,301 @@
+import atexit
+import fcntl
+import json
+import logging
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from xml.sax.saxutils import XMLGenerator
+
+from jinja2 import Environment
+
+from derived import created_at
+from shared import BackgroundFlusher, write_atomic
+
+logger = logging.getLogger("blog.snapshots")
+
+# Sitemaps are capped at 50,000 URLs; past that sitemap.xml becomes an index
+SITEMAP_MAX_URLS = 50000
+SITEMAP_CHUNK_RE = re.compile(r"^sitemap-\d+\.xml$")
+
+# Everything a page needs from the post document
+SNAPSHOT_PROJECTION = {
+    "title": 1,
+    "category": 1,
+    "coverImage": 1,
+    "author.name": 1,
+    "excerpt": 1,
+    "contentHtml": 1,
+    "readingTime": 1,
+    "createdAt": 1,
+    "updatedAt": 1,
+}
+
+POST_TEMPLATE = Environment(autoescape=True).from_string("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{{ post.title }} | {{ site_title }}</title>
+<meta name="description" content="{{ post.excerpt }}">
+<link rel="canonical" href="{{ url }}">
+<meta property="og:type" content="article">
+<meta property="og:title" content="{{ post.title }}">
+<meta property="og:description" content="{{ post.excerpt }}">
+<meta property="og:url" content="{{ url }}">
+{% if post.coverImage %}<meta property="og:image" content="{{ site_url }}{{ post.coverImage }}">{% endif %}
+<style>
+body{margin:0;font-family:system-ui,sans-serif;background:#f3f4f6;color:#1f2937}
+header{background:#1e3a8a;color:#fff;padding:1.5rem}
+header a{color:#fff;text-decoration:none;font-weight:600}
+main{max-width:64rem;margin:0 auto;padding:2rem 1.5rem}
+h1{text-transform:uppercase;font-size:2rem;margin:0 0 .5rem}
+.meta{color:#6b7280;margin-bottom:1.5rem}
+img{max-width:100%;height:auto;border-radius:.5rem}
+article{background:#fff;padding:2rem;border-radius:.5rem;line-height:1.7;font-size:1.1rem}
+</style>
+</head>
+<body>
+<header><a href="/">{{ site_title }}</a></header>
+<main>
+<h1>{{ post.title }}</h1>
+<p class="meta">By {{ post.author.name if post.author else "Unknown" }}
+ &middot; <time datetime="{{ post.createdAt.isoformat() }}">{{ post.createdAt.strftime("%B %d, %Y") }}</time>
+{% if post.readingTime %} &middot; {{ post.readingTime }} min read{% endif %}</p>
+{% if post.coverImage %}<p><img src="{{ post.coverImage }}" alt="{{ post.title }}"></p>{% endif %}
+<article>{{ post.contentHtml | safe }}</article>
+</main>
+</body>
+</html>
+""")
+
+
+def write_sitemap(stream, urls):
+    """Stream a sitemap to a binary file object; urls: iterable of (loc, lastmod)"""
+    xml = XMLGenerator(stream, encoding="utf-8", short_empty_elements=True)
+    xml.startDocument()
+    xml.startElement("urlset", {"xmlns": "http://www.sitemaps.org/schemas/sitemap/0.9"})
+    for loc, lastmod in urls:
+        xml.startElement("url", {})
+        xml.startElement("loc", {})
+        xml.characters(loc)
+        xml.endElement("loc")
+        if lastmod:
+            xml.startElement("lastmod", {})
+            xml.characters(lastmod)
+            xml.endElement("lastmod")
+        xml.endElement("url")
+    xml.endElement("urlset")
+    xml.endDocument()
+
+
+def write_sitemap_index(stream, locs):
+    xml = XMLGenerator(stream, encoding="utf-8", short_empty_elements=True)
+    xml.startDocument()
+    xml.startElement("sitemapindex", {"xmlns": "http://www.sitemaps.org/schemas/sitemap/0.9"})
+    for loc in locs:
+        xml.startElement("sitemap", {})
+        xml.startElement("loc", {})
+        xml.characters(loc)
+        xml.endElement("loc")
+        xml.endElement("sitemap")
+    xml.endElement("sitemapindex")
+    xml.endDocument()
+
+
+class SnapshotStore:
+    """
+    Published posts pre-rendered to static HTML, plus sitemap.xml and a
+    manifest.json listing every page (path, updatedAt, size).
+
+    Layout under `directory`: posts/<id>.html, sitemap.xml (an index of
+    sitemap-<n>.xml past 50,000 URLs), manifest.json.
+    A front proxy can serve them without touching the app, e.g. nginx:
+
+        location /posts/ { try_files /snapshots$uri.html @app; }
+        location = /sitemap.xml { try_files /snapshots/sitemap.xml @app; }
+
+    Pages are (re)written one at a time as posts change. Rewriting the
+    manifest and sitemap takes seconds on a large site, so a change only
+    appends a line to journal.ndjson; a background thread in each process
+    folds the journal into them at most every index_interval seconds (and
+    flush() on exit). index_interval=0 updates them synchronously.
+    """
+
+    def __init__(self, directory, site_url, site_title, index_interval=0):
+        self.directory = directory
+        self.site_url = site_url
+        self.site_title = site_title
+        self.index_interval = index_interval
+        self.posts_dir = os.path.join(directory, "posts")
+        os.makedirs(self.posts_dir, exist_ok=True)
+        self._flusher = BackgroundFlusher(self._flush_logged, index_interval, "snapshot-indexer")
+        atexit.register(self._flush_logged)
+
+    def page_path(self, post_id):
+        return os.path.join(self.posts_dir, f"{post_id}.html")
+
+    @property
+    def sitemap_path(self):
+        return os.path.join(self.directory, "sitemap.xml")
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, "manifest.json")
+
+    @property
+    def journal_path(self):
+        return os.path.join(self.directory, "journal.ndjson")
+
+    @property
+    def pending_path(self):
+        """Journal taken by a flush that hasn't finished (or crashed)"""
+        return os.path.join(self.directory, "journal.pending")
+
+    @contextmanager
+    def _locked(self, name=".lock"):
+        with open(os.path.join(self.directory, name), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)["pages"]
+        except FileNotFoundError:
+            return {}
+
+    def _render(self, post):
+        """Write one post's page; returns its manifest entry"""
+        post_id = str(post["_id"])
+        post = {**post, "createdAt": created_at(post)}
+        html = POST_TEMPLATE.render(
+            post=post,
+            url=f"{self.site_url}/posts/{post_id}",
+            site_url=self.site_url,
+            site_title=self.site_title,
+        ).encode("utf-8")
+        write_atomic(self.page_path(post_id), lambda f: f.write(html))
+        updated = post.get("updatedAt") or post["createdAt"]
+        return {
+            "path": f"posts/{post_id}.html",
+            "updatedAt": updated.isoformat(),
+            "bytes": len(html),
+        }
+
+    def _write_index(self, pages):
+        """Rewrite manifest.json and the sitemap(s) from the page entries"""
+        urls = [(f"{self.site_url}/", None)] + [
+            (f"{self.site_url}/posts/{post_id}", entry["updatedAt"][:10])
+            for post_id, entry in sorted(pages.items())
+        ]
+        chunks = set()
+        if len(urls) <= SITEMAP_MAX_URLS:
+            write_atomic(self.sitemap_path, lambda f: write_sitemap(f, urls))
+        else:
+            locs = []
+            for n, start in enumerate(range(0, len(urls), SITEMAP_MAX_URLS), start=1):
+                chunk = urls[start:start + SITEMAP_MAX_URLS]
+                write_atomic(
+                    os.path.join(self.directory, f"sitemap-{n}.xml"),
+                    lambda f, chunk=chunk: write_sitemap(f, chunk),
+                )
+                locs.append(f"{self.site_url}/sitemap-{n}.xml")
+                chunks.add(f"sitemap-{n}.xml")
+            write_atomic(self.sitemap_path, lambda f: write_sitemap_index(f, locs))
+        for name in os.listdir(self.directory):
+            if SITEMAP_CHUNK_RE.match(name) and name not in chunks:
+                os.remove(os.path.join(self.directory, name))
+
+        manifest = {"generatedAt": datetime.utcnow().isoformat(), "pages": pages}
+        write_atomic(
+            self.manifest_path,
+            lambda f: f.write(json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8")),
+        )
+
+    def _append(self, change):
+        """Journal one index change; the flusher applies it later"""
+        line = (json.dumps(change) + "\n").encode("utf-8")
+        with self._locked():
+            with open(self.journal_path, "ab") as f:
+                f.write(line)
+        if self.index_interval <= 0:
+            self.flush()
+        else:
+            self._flusher.ensure_started()
+
+    def _flush_logged(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.exception("Error updating snapshot index: %s", e)
+
+    def flush(self):
+        """
+        Fold journalled changes into manifest.json and the sitemap(s).
+        Returns the number of changes applied.
+        """
+        # One flush at a time across workers; writers only wait for the
+        # journal to be moved aside, not for the index to be rewritten
+        with self._locked(".flush-lock"):
+            with self._locked():
+                if os.path.exists(self.journal_path):
+                    if os.path.exists(self.pending_path):
+                        with open(self.journal_path, "rb") as src, open(self.pending_path, "ab") as dst:
+                            dst.write(src.read())
+                        os.remove(self.journal_path)
+                    else:
+                        os.replace(self.journal_path, self.pending_path)
+            try:
+                with open(self.pending_path, "rb") as f:
+                    changes = [json.loads(line) for line in f if line.strip()]
+            except FileNotFoundError:
+                return 0
+
+            pages = self._read_manifest()
+            for change in changes:
+                if change.get("entry"):
+                    pages[change["id"]] = change["entry"]
+                else:
+                    pages.pop(change["id"], None)
+            self._write_index(pages)
+            os.remove(self.pending_path)
+            return len(changes)
+
+    def update(self, post):
+        """Render (or re-render) one published post and journal its entry"""
+        entry = self._render(post)
+        self._append({"id": str(post["_id"]), "entry": entry})
+
+    def remove(self, post_id):
+        """Drop one post's page and journal its removal"""
+        post_id = str(post_id)
+        try:
+            os.remove(self.page_path(post_id))
+        except FileNotFoundError:
+            pass
+        self._append({"id": post_id})
+
+    def rebuild(self, posts):
+        """
+        Render every post from an iterable (e.g. a cursor) and replace the
+        index; pages of posts no longer in it are removed, and journalled
+        changes are superseded. Returns the count.
+        """
+        pages = {}
+        for post in posts:
+            pages[str(post["_id"])] = self._render(post)
+
+        with self._locked(".flush-lock"), self._locked():
+            for name in os.listdir(self.posts_dir):
+                if name.endswith(".html") and name[:-5] not in pages:
+                    os.remove(os.path.join(self.posts_dir, name))
+            self._write_index(pages)
+            for path in (self.journal_path, self.pending_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        return len(pages)
@@ -0,0 +1,51 @@
+import orjson
+from bson import ObjectId
+
+
+def _default(value):
+    """orjson hook for types it doesn't know natively (datetime is native)"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError
+
+
+def make_post_encoder(fields=None):
+    """
+    Build a function that encodes one post document to JSON bytes.
+
+    Same output as serialize_post, but the input document is left untouched
+    and the field list is resolved once rather than per document.
+    fields: names to copy (None means every field of the document).
+    """
+    copy_fields = tuple(f for f in fields if f != "_id") if fields else None
+    dumps = orjson.dumps
+
+    def encode(post):
+        if copy_fields is None:
+            out = {k: v for k, v in post.items() if k != "_id"}
+        else:
+            out = {k: post[k] for k in copy_fields if k in post}
+
+        out["_id"] = str(post["_id"])
+        return dumps(out, default=_default)
+
+    return encode
+
+
+def stream_json_array(docs, encode):
+    """Yield a JSON array one encoded document at a time"""
+    yield b"["
+    first = True
+    for doc in docs:
+        if first:
+            first = False
+            yield encode(doc)
+        else:
+            yield b"," + encode(doc)
+    yield b"]"
+
+
+def stream_ndjson(docs, encode):
+    """Yield newline-delimited JSON, one document per line"""
+    for doc in docs:
+        yield encode(doc) + b"\n"
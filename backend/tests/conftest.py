@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The backend is a flat set of modules run from its own directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Config reads the environment at import; nothing connects until first use
+_tmp = tempfile.mkdtemp(prefix="blog-tests-")
+os.environ.update(
+    MONGO_URI="mongodb://localhost:27017",
+    db_name="blog_tests",
+    UPLOADS_DIR=os.path.join(_tmp, "uploads"),
+    SNAPSHOTS_DIR=os.path.join(_tmp, "snapshots"),
+    RATE_LIMIT_ENABLED="false",
+    STATIC_SNAPSHOTS="false",
+    SEARCH_BACKEND="memory",
+    LOG_LEVEL="WARNING",
+)
+
+
+@pytest.fixture
+def blog():
+    """The app module, on a fresh in-memory database"""
+    mongomock = pytest.importorskip("mongomock")
+    import app as blog
+    from config import Config
+
+    Config.MONGO.use_client(mongomock.MongoClient())
+    blog.post_cache.clear()
+    return blog
+
+
+@pytest.fixture
+def client(blog):
+    return blog.app.test_client()
+
+
+@pytest.fixture
+def auth_headers(blog):
+    """Authorization header for a freshly inserted author"""
+    from flask_jwt_extended import create_access_token
+    from config import Config
+
+    user = {"username": "author", "email": "author@example.com", "password": "x"}
+    user["_id"] = Config.MONGO.db.users.insert_one(user).inserted_id
+    with blog.app.app_context():
+        token = create_access_token(identity=str(user["_id"]), additional_claims=blog.user_claims(user))
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,120 @@
+import pytest
+
+from text import html_to_text, sanitize_html
+
+
+@pytest.mark.parametrize("payload", [
+    "<script>alert(1)</script>",
+    "<SCRIPT SRC=//evil.example/x.js></SCRIPT>",
+    "<script>alert(1)",
+    "<style>body{background:url(javascript:alert(1))}</style>",
+    "<iframe src=javascript:alert(1)></iframe>",
+    "<object data=javascript:alert(1)></object>",
+    "<embed src=javascript:alert(1)>",
+    "<template><img src=x onerror=alert(1)></template>",
+    "<svg><script>alert(1)</script></svg>",
+    "<!--<script>alert(1)</script>-->",
+])
+def test_script_content_is_dropped(payload):
+    cleaned = sanitize_html(payload)
+    assert "alert" not in cleaned
+    assert "<script" not in cleaned.lower()
+
+
+def test_split_tags_stay_text():
+    # Whatever is left of the outer "tag" is escaped text, not markup
+    assert sanitize_html("<scr<script>ipt>alert(1)</script>") == "ipt&gt;alert(1)"
+
+
+@pytest.mark.parametrize("payload", [
+    "<img src=x onerror=alert(1)>",
+    "<IMG SRC=x OnError=alert(1)>",
+    '<p onclick="alert(1)">hi</p>',
+    '<a href="/" onmouseover="alert(1)">x</a>',
+    "<body onload=alert(1)>",
+    "<svg onload=alert(1)>",
+    "<details open ontoggle=alert(1)>",
+])
+def test_event_handlers_are_dropped(payload):
+    cleaned = sanitize_html(payload)
+    assert "alert" not in cleaned
+    assert " on" not in cleaned.lower()
+
+
+@pytest.mark.parametrize("href", [
+    "javascript:alert(1)",
+    "JaVaScRiPt:alert(1)",
+    "  javascript:alert(1)",
+    "java&#x09;script:alert(1)",
+    "java&#10;script:alert(1)",
+    "&#106;&#97;&#118;&#97;&#115;&#99;&#114;&#105;&#112;&#116;:alert(1)",
+    "javascript&colon;alert(1)",
+    "vbscript:msgbox(1)",
+    "data:text/html;base64,PHNjcmlwdD5hbGVydCgxKTwvc2NyaXB0Pg==",
+])
+def test_unsafe_link_schemes_are_dropped(href):
+    cleaned = sanitize_html(f'<a href="{href}">x</a>')
+    assert "href" not in cleaned
+    assert cleaned == '<a rel="nofollow noopener">x</a>'
+
+
+@pytest.mark.parametrize("src", [
+    "javascript:alert(1)",
+    "data:image/svg+xml;base64,PHN2ZyBvbmxvYWQ9YWxlcnQoMSk+",
+    "data:text/html,<script>alert(1)</script>",
+])
+def test_unsafe_image_sources_are_dropped(src):
+    assert sanitize_html(f'<img src="{src}">') == "<img>"
+
+
+def test_safe_urls_are_kept():
+    assert sanitize_html('<a href="https://example.com/a?b=1&amp;c=2">x</a>') == (
+        '<a href="https://example.com/a?b=1&amp;c=2" rel="nofollow noopener">x</a>'
+    )
+    assert sanitize_html('<img src="/uploads/a.webp" alt="A">') == '<img src="/uploads/a.webp" alt="A">'
+    data = "data:image/png;base64,iVBORw0KGgo="
+    assert sanitize_html(f'<img src="{data}">') == f'<img src="{data}">'
+
+
+@pytest.mark.parametrize("style", [
+    "background-image: url(javascript:alert(1))",
+    "width: expression(alert(1))",
+    "color: red; behavior: url(x.htc)",
+    "font-family: </style><script>alert(1)</script>",
+])
+def test_unsafe_styles_are_dropped(style):
+    cleaned = sanitize_html(f'<span style="{style}">x</span>')
+    assert "alert" not in cleaned
+    assert "url(" not in cleaned
+    assert "expression" not in cleaned
+
+
+def test_allowed_styles_are_kept():
+    assert sanitize_html('<span style="color: red; position: fixed">x</span>') == (
+        '<span style="color: red">x</span>'
+    )
+
+
+def test_attribute_values_cannot_break_out():
+    cleaned = sanitize_html('<a title="&quot;><script>alert(1)</script>" href="/">x</a>')
+    assert "<script" not in cleaned
+    assert 'title="&quot;&gt;&lt;script&gt;' in cleaned
+
+
+def test_text_is_escaped():
+    assert sanitize_html("<p>1 &lt; 2 &amp;&amp; &lt;b&gt;</p>") == "<p>1 &lt; 2 &amp;&amp; &lt;b&gt;</p>"
+
+
+def test_disallowed_tags_are_unwrapped_and_elements_balanced():
+    assert sanitize_html("<form><p>Hello <b>world</form>") == "<p>Hello <b>world</b></p>"
+    assert sanitize_html("</div><p>x") == "<p>x</p>"
+
+
+def test_empty_content():
+    assert sanitize_html(None) == ""
+    assert sanitize_html("") == ""
+
+
+def test_plain_text_skips_dropped_content():
+    text = html_to_text(sanitize_html("<p>Hello</p><script>alert(1)</script><p>world</p>"))
+    assert text == "Hello world"
@@ -0,0 +1,80 @@
+import pytest
+
+from config import Config
+
+
+@pytest.fixture
+def post_id(client, auth_headers):
+    response = client.post("/api/create-post", headers=auth_headers, json={
+        "title": "First",
+        "category": "tech",
+        "status": "published",
+        # Long enough to be compressed (COMPRESS_MIN_SIZE)
+        "content": "<p>" + "Some words to read. " * 200 + "</p>",
+    })
+    assert response.status_code == 201, response.json
+    return response.json["postId"]
+
+
+def current_etag(client, post_id, **headers):
+    response = client.get(f"/api/posts/{post_id}", headers=headers)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+def test_matching_etag_updates_and_returns_the_next_one(client, auth_headers, post_id):
+    etag = current_etag(client, post_id)
+    response = client.patch(f"/api/posts/{post_id}", json={"title": "Second"},
+                            headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 200
+    assert response.json["title"] == "Second"
+    assert response.headers["ETag"] != etag
+    assert response.headers["ETag"] == current_etag(client, post_id)
+
+
+def test_stale_etag_is_rejected(client, auth_headers, post_id):
+    stale = current_etag(client, post_id)
+    response = client.patch(f"/api/posts/{post_id}", json={"title": "Second"},
+                            headers={**auth_headers, "If-Match": stale})
+    assert response.status_code == 200
+
+    response = client.patch(f"/api/posts/{post_id}", json={"title": "Third"},
+                            headers={**auth_headers, "If-Match": stale})
+    assert response.status_code == 412
+    assert response.json["version"] == 2
+    assert Config.MONGO.db.posts.find_one()["title"] == "Second"
+
+
+def test_missing_if_match_is_rejected(client, auth_headers, post_id):
+    response = client.patch(f"/api/posts/{post_id}", json={"title": "Second"}, headers=auth_headers)
+    assert response.status_code == 428
+    assert Config.MONGO.db.posts.find_one()["title"] == "First"
+
+
+def test_compressed_etag_is_accepted(client, auth_headers, post_id):
+    etag = current_etag(client, post_id, **{"Accept-Encoding": "gzip"})
+    assert etag.endswith('-gzip"')
+
+    response = client.put(f"/api/posts/{post_id}", json={"title": "Second"},
+                          headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 200
+    assert response.json["title"] == "Second"
+
+
+def test_legacy_cover_must_be_the_current_one(client, auth_headers, post_id):
+    legacy = "/uploads/images/1699999999_old-cover.jpg"
+    Config.MONGO.db.posts.update_one({}, {"$set": {"coverImage": legacy}})
+    etag = current_etag(client, post_id)
+
+    response = client.patch(f"/api/posts/{post_id}",
+                            json={"coverImage": "/uploads/images/1699999999_other.jpg"},
+                            headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 400
+    assert Config.MONGO.db.posts.find_one()["coverImage"] == legacy
+
+    # Re-sending the cover the post already has leaves it alone
+    response = client.patch(f"/api/posts/{post_id}",
+                            json={"title": "Second", "coverImage": legacy},
+                            headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 200
+    assert Config.MONGO.db.posts.find_one()["coverImage"] == legacy
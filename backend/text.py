@@ -0,0 +1,160 @@
+import html
+import re
+import unicodedata
+from html.parser import HTMLParser
+
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+SLUG_LENGTH = 80
+
+# What the post editor can produce; anything else is dropped (tags are
+# unwrapped, their text kept) by sanitize_html
+ALLOWED_TAGS = {
+    "a": {"href", "title"},
+    "b": set(), "strong": set(), "i": set(), "em": set(), "u": set(),
+    "s": set(), "strike": set(), "sub": set(), "sup": set(),
+    "p": set(), "div": set(), "br": set(), "hr": set(), "span": set(),
+    "h1": set(), "h2": set(), "h3": set(), "h4": set(), "h5": set(), "h6": set(),
+    "ul": set(), "ol": set(), "li": set(), "blockquote": set(),
+    "pre": set(), "code": set(),
+    "font": {"color", "face", "size"},
+    "img": {"src", "alt"},
+}
+ALLOWED_STYLES = {
+    "color", "background-color", "font-family", "font-size", "font-weight",
+    "font-style", "text-align", "text-decoration",
+}
+VOID_TAGS = {"br", "hr", "img"}
+DROP_CONTENT_TAGS = {"script", "style", "iframe", "object", "embed", "template"}
+
+_SAFE_URL_RE = re.compile(r"^(https?:|mailto:|/|#|[^:]*$)", re.IGNORECASE)
+_SAFE_IMAGE_DATA_RE = re.compile(r"^data:image/(png|jpeg|gif|webp);base64,", re.IGNORECASE)
+_UNSAFE_STYLE_RE = re.compile(r"url\(|expression|javascript:|[<>]", re.IGNORECASE)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def html_to_text(content):
+    """Strip tags and entities from the (HTML) post body"""
+    if not content:
+        return ""
+    text = html.unescape(_TAG_RE.sub(" ", content))
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def make_excerpt(content, length=EXCERPT_LENGTH):
+    """Build a plain-text excerpt from the (HTML) post body"""
+    text = html_to_text(content)
+    if len(text) <= length:
+        return text
+
+    # Cut on a word boundary so we don't end mid-word
+    cut = text[:length].rsplit(" ", 1)[0] or text[:length]
+    return cut + "..."
+
+
+def count_words(content):
+    """Number of words in the (HTML) post body"""
+    return len(html_to_text(content).split())
+
+
+def reading_time(words):
+    """Whole minutes to read `words` words, at least one"""
+    return max(1, round(words / WORDS_PER_MINUTE))
+
+
+def slugify(title, length=SLUG_LENGTH):
+    """ASCII, lowercase, hyphen-separated version of a title"""
+    text = unicodedata.normalize("NFKD", title or "").encode("ascii", "ignore").decode()
+    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    return slug[:length].rstrip("-") or "post"
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.open_tags = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth or tag not in ALLOWED_TAGS:
+            return
+
+        kept = []
+        for name, value in attrs:
+            value = value or ""
+            if name == "style":
+                value = _clean_style(value)
+            elif name not in ALLOWED_TAGS[tag]:
+                continue
+            elif name == "href" and not _SAFE_URL_RE.match(value.strip()):
+                continue
+            elif name == "src" and not (
+                _SAFE_URL_RE.match(value.strip()) or _SAFE_IMAGE_DATA_RE.match(value)
+            ):
+                continue
+            if value:
+                kept.append(f' {name}="{html.escape(value, quote=True)}"')
+        if tag == "a":
+            kept.append(' rel="nofollow noopener"')
+
+        self.out.append(f"<{tag}{''.join(kept)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth -= 1
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth or tag not in self.open_tags:
+            return
+        # Close anything left open inside this element as well
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.out.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.out.append(html.escape(data, quote=False))
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self.out.append(f"</{self.open_tags.pop()}>")
+        return "".join(self.out)
+
+
+def _clean_style(style):
+    """Keep only allow-listed, harmless CSS declarations"""
+    kept = []
+    for declaration in style.split(";"):
+        name, _, value = declaration.partition(":")
+        name, value = name.strip().lower(), value.strip()
+        if name in ALLOWED_STYLES and value and not _UNSAFE_STYLE_RE.search(value):
+            kept.append(f"{name}: {value}")
+    return "; ".join(kept)
+
+
+def sanitize_html(content):
+    """
+    Render the editor's HTML safe to insert into the page: only tags and
+    attributes the editor produces survive, scripts/handlers/unsafe URLs are
+    removed and every element is balanced.
+    """
+    if not content:
+        return ""
+    parser = _Sanitizer()
+    parser.feed(content)
+    return parser.close()
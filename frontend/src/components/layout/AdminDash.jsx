@@ -6,17 +6,24 @@ import { Edit2, Trash2 } from "lucide-react";
 
 export default function AdminDashboard() {
   const [isModalOpen, setIsModalOpen] = useState(false);
+  const [editingPost, setEditingPost] = useState(null);
   const [posts, setPosts] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   
   useEffect(() => {
     fetchPosts();
   }, []);
 
-  const fetchPosts = async () => {
+  const fetchPosts = async (cursor = null) => {
     try {
-      const response = await api.get("/posts");
-      setPosts(response.data);
+      const response = await api.get("/posts", {
+        params: { limit: 50, ...(cursor && { cursor }) },
+      });
+      setPosts((prev) =>
+        cursor ? [...prev, ...response.data.posts] : response.data.posts
+      );
+      setNextCursor(response.data.next);
     } catch (err) {
       console.error("Failed to fetch posts:", err);
     } finally {
@@ -35,6 +42,23 @@ export default function AdminDashboard() {
     }
   };
 
+  const editPost = async (id) => {
+    try {
+      // The list only has summaries; editing needs the full body and version
+      const response = await api.get(`/posts/${id}`);
+      // The ETag is sent back as If-Match when the edit is saved
+      setEditingPost({ ...response.data, etag: response.headers.etag });
+      setIsModalOpen(true);
+    } catch (err) {
+      console.error("Failed to load post:", err);
+    }
+  };
+
+  const closeModal = () => {
+    setIsModalOpen(false);
+    setEditingPost(null);
+  };
+
   return (
     <div className="min-h-screen bg-gray-100 text-[#0A1A2F] flex">
       {/* Sidebar */}
@@ -56,7 +80,7 @@ export default function AdminDashboard() {
         <div className="flex justify-between items-center mb-8">
           <h1 className="text-3xl font-bold">Dashboard</h1>
             <button
-                onClick={() => setIsModalOpen(true)}
+                onClick={() => { setEditingPost(null); setIsModalOpen(true); }}
                 className="bg-cyan-500 text-white px-4 py-2 rounded-lg hover:bg-cyan-600"
                 >
                 + New Post
@@ -128,7 +152,10 @@ export default function AdminDashboard() {
                       </span>
                     </td>
                     <td className="p-4 space-x-3 flex items-center">
-                      <button className="text-cyan-600 hover:text-cyan-700">
+                      <button
+                        onClick={() => editPost(post._id)}
+                        className="text-cyan-600 hover:text-cyan-700"
+                      >
                         <Edit2 size={18} />
                       </button>
                       <button
@@ -143,12 +170,28 @@ export default function AdminDashboard() {
               )}
             </tbody>
           </table>
+          {nextCursor && (
+            <div className="p-4 text-center border-t">
+              <button
+                onClick={() => fetchPosts(nextCursor)}
+                className="text-cyan-600 font-semibold hover:underline"
+              >
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       </main>
         <CreatePostModal
             isOpen={isModalOpen}
-            onClose={() => setIsModalOpen(false)}
-            onPostCreated={fetchPosts}
+            onClose={closeModal}
+            onPostCreated={() => fetchPosts()}
+            post={editingPost}
+            onPostUpdated={(updated) =>
+              setPosts((prev) =>
+                prev.map((p) => (p._id === updated._id ? { ...p, ...updated } : p))
+              )
+            }
         />
     </div>
   );
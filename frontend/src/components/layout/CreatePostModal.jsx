@@ -1,7 +1,8 @@
 import { useState, useRef, useEffect } from "react";
 import api from "../../api";
 
-export default function CreatePostModal({ isOpen, onClose }) {
+// Pass `post` (the full post from GET /posts/:id) to edit it instead
+export default function CreatePostModal({ isOpen, onClose, post = null, onPostUpdated }) {
   const editorRef = useRef(null);
   const fileInputRef = useRef(null);
   const coverInputRef = useRef(null);
@@ -23,8 +24,17 @@ export default function CreatePostModal({ isOpen, onClose }) {
       setCoverPreview(null);
       setError("");
       if (editorRef.current) editorRef.current.innerHTML = "";
+    } else if (post) {
+      setFormData({
+        title: post.title || "",
+        category: post.category || "",
+        status: post.status || "draft",
+        coverImage: post.coverImage || null,
+      });
+      setCoverPreview(post.coverImage ? `http://localhost:5000${post.coverImage}` : null);
+      if (editorRef.current) editorRef.current.innerHTML = post.content || "";
     }
-  }, [isOpen]);
+  }, [isOpen, post]);
 
   if (!isOpen) return null;
 
@@ -74,7 +84,7 @@ export default function CreatePostModal({ isOpen, onClose }) {
     reader.readAsDataURL(file);
   };
 
-  const handleCoverImageChange = (e) => {
+  const handleCoverImageChange = async (e) => {
     const file = e.target.files[0];
     if (!file) return;
 
@@ -83,13 +93,23 @@ export default function CreatePostModal({ isOpen, onClose }) {
       return;
     }
 
-    const reader = new FileReader();
-    reader.onload = () => {
-      setCoverPreview(reader.result);
-      setFormData((prev) => ({ ...prev, coverImage: reader.result }));
+    // Upload the file as-is; the post only references the returned path
+    setCoverPreview(URL.createObjectURL(file));
+    setLoading(true);
+    try {
+      const body = new FormData();
+      body.append("image", file);
+      const res = await api.post("/uploads/images", body, {
+        headers: { "Content-Type": "multipart/form-data" },
+      });
+      setFormData((prev) => ({ ...prev, coverImage: res.data.path }));
       setError("");
-    };
-    reader.readAsDataURL(file);
+    } catch (err) {
+      setCoverPreview(null);
+      setError(err.response?.data?.error || "Failed to upload cover image");
+    } finally {
+      setLoading(false);
+    }
   };
 
   const getEditorContent = () => {
@@ -127,6 +147,11 @@ export default function CreatePostModal({ isOpen, onClose }) {
       return;
     }
 
+    if (post) {
+      await saveChanges(content);
+      return;
+    }
+
     try {
       await api.post("/create-post", {
         ...formData,
@@ -144,13 +169,44 @@ export default function CreatePostModal({ isOpen, onClose }) {
     }
   };
 
+  // Send only what changed, against the version we loaded; the server
+  // answers 412 if someone else saved in between
+  const saveChanges = async (content) => {
+    const changes = {};
+    if (formData.title.trim() !== post.title) changes.title = formData.title.trim();
+    if (formData.category !== post.category) changes.category = formData.category;
+    if (formData.status !== post.status) changes.status = formData.status;
+    if (content !== post.content) changes.content = content;
+    if (formData.coverImage !== (post.coverImage || null)) changes.coverImage = formData.coverImage;
+
+    if (Object.keys(changes).length === 0) {
+      setLoading(false);
+      onClose();
+      return;
+    }
+
+    try {
+      const res = await api.patch(`/posts/${post._id}`, changes, {
+        headers: { "If-Match": post.etag || `"v${post.version ?? 0}"` },
+      });
+      onPostUpdated?.(res.data);
+      onClose();
+    } catch (err) {
+      setError(err.response?.data?.error || "Failed to update post");
+    } finally {
+      setLoading(false);
+    }
+  };
+
   return (
     <div className="fixed inset-0 z-50 flex items-center justify-center bg-black/60 backdrop-blur-sm p-4">
       <div className="bg-white w-full max-w-4xl rounded-2xl shadow-2xl overflow-hidden max-h-[95vh] flex flex-col">
 
         {/* Header */}
         <div className="flex items-center justify-between px-6 py-4 border-b bg-gray-50">
-          <h2 className="text-xl font-bold text-gray-800">Create New Post</h2>
+          <h2 className="text-xl font-bold text-gray-800">
+            {post ? "Edit Post" : "Create New Post"}
+          </h2>
           <button
             onClick={onClose}
             className="text-gray-500 hover:text-red-600 text-2xl font-bold"
@@ -332,6 +388,8 @@ export default function CreatePostModal({ isOpen, onClose }) {
             >
               {loading
                 ? "Saving..."
+                : post
+                ? "Save Changes"
                 : formData.status === "published"
                 ? "Publish"
                 : "Save Draft"}
@@ -2,6 +2,11 @@ import { Link } from "react-router-dom";
 import { useState, useEffect } from "react";
 import api from "../../api";
 
+// "/uploads/images/<stem>.png" -> "/uploads/images/<size>/<stem>.webp"
+function imageVariant(path, size) {
+  return path.replace(/^(\/uploads\/images)\/([^/]+)\.\w+$/, `$1/${size}/$2.webp`);
+}
+
 export default function HomePage() {
   const [featuredPosts, setFeaturedPosts] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -12,8 +17,8 @@ export default function HomePage() {
 
   async function fetchFeaturedPosts() {
     try {
-      const response = await api.get("/posts?status=published");
-      setFeaturedPosts(response.data);
+      const response = await api.get("/posts?status=published&limit=9");
+      setFeaturedPosts(response.data.posts);
     } catch (error) {
       console.error("Error fetching featured posts:", error);
     } finally {
@@ -70,7 +75,10 @@ export default function HomePage() {
                 {/* Cover image */}
                 {post.coverImage ? (
                   <img
-                    src={post.coverImage}
+                    src={imageVariant(post.coverImage, "card")}
+                    srcSet={`${imageVariant(post.coverImage, "thumb")} 320w, ${imageVariant(post.coverImage, "card")} 640w`}
+                    sizes="(min-width: 768px) 33vw, 100vw"
+                    loading="lazy"
                     alt={post.title}
                     className="w-full h-48 object-cover rounded-t-xl"
                   />
@@ -49,6 +49,10 @@ export default function SinglePost() {
             {new Date(post.createdAt).toLocaleDateString()}
           </p>
 
+          {post.readingTime && (
+            <p className="text-sm opacity-75">{post.readingTime} min read</p>
+          )}
+
           {/* <p className="text-xs uppercase mt-2 opacity-75 hidden md:block">
             {post.category}
           </p> */}
@@ -81,9 +85,17 @@ export default function SinglePost() {
 
           {/* Content */}
           <div className="bg-white p-6 md:p-8 rounded-lg shadow">
-            <div className="whitespace-pre-line text-gray-800 text-base md:text-lg leading-relaxed">
-              {post.content}
-            </div>
+            {post.contentHtml ? (
+              // Sanitized on the server when the post is saved
+              <div
+                className="text-gray-800 text-base md:text-lg leading-relaxed"
+                dangerouslySetInnerHTML={{ __html: post.contentHtml }}
+              />
+            ) : (
+              <div className="whitespace-pre-line text-gray-800 text-base md:text-lg leading-relaxed">
+                {post.content}
+              </div>
+            )}
           </div>
 
         </div>